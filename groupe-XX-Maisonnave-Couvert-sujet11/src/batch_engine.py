@@ -0,0 +1,258 @@
+import numpy as np
+from array import array
+from game_engine import Minesweeper, MoveDelta
+
+# État des parties du lot
+PLAYING, WON, LOST = 0, 1, -1
+
+
+def neighbor_sum(a):
+    """Somme des 8 voisins de chaque case, pour toutes les grilles à la fois (a : (N, H, W)).
+    Équivalent d'une convolution par le noyau 3x3 de 1 (centre exclu)"""
+    a = a.astype(np.int8)
+    # Noyau séparable : somme sur 3 colonnes, puis sur 3 lignes, moins la case elle-même
+    rows = a.copy()
+    rows[:, :, 1:] += a[:, :, :-1]
+    rows[:, :, :-1] += a[:, :, 1:]
+    out = rows.copy()
+    out[:, 1:, :] += rows[:, :-1, :]
+    out[:, :-1, :] += rows[:, 1:, :]
+    out -= a
+    return out
+
+
+class BatchMinesweeper:
+    """N parties de même taille, stockées en tableaux NumPy empilés (N, hauteur, largeur).
+
+    Pose des mines, calcul des nombres, révélations et flood fill sont faits pour
+    tout le lot en quelques opérations vectorisées. view(i) donne un Minesweeper
+    branché sur la partie i (pour CSPSolver) : ses coups passent par le lot.
+    `seeds` (une graine par partie) rend chaque grille indépendante du lot où
+    elle est jouée ; sinon tout le lot est tiré d'un seul générateur (`seed`).
+    """
+    def __init__(self, n_games, width=10, height=10, num_mines=10, seed=None, seeds=None):
+        if num_mines > width * height - 9:
+            raise ValueError("Trop de mines pour garder le premier clic et ses voisins libres")
+        self.n_games = n_games
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        self.rng = np.random.default_rng(seed)
+        if seeds is not None and len(seeds) != n_games:
+            raise ValueError("Une graine par partie attendue")
+        self.seeds = seeds
+        shape = (n_games, height, width)
+        self.mines = np.zeros(shape, dtype=bool)
+        self.counts = np.zeros(shape, dtype=np.int8) # -1 pour une mine
+        self.revealed = np.zeros(shape, dtype=bool)
+        self.flags = np.zeros(shape, dtype=bool)
+        self.status = np.full(n_games, PLAYING, dtype=np.int8)
+        self.moves = np.zeros(n_games, dtype=np.int64)
+        self.started = False
+        self._views = {}
+
+    def start(self, xs=None, ys=None):
+        """Premier clic de chaque partie (au hasard par défaut) : pose les mines en
+        évitant la case cliquée et ses voisines, puis la révèle"""
+        n, h, w = self.mines.shape
+        if self.seeds is None:
+            clicks = np.stack([self.rng.integers(0, w, n), self.rng.integers(0, h, n)], axis=1)
+            keys = self.rng.random((n, h * w))
+        else:
+            # Un générateur par partie : même grille quel que soit le découpage en lots
+            clicks = np.zeros((n, 2), dtype=np.int64)
+            keys = np.empty((n, h * w))
+            for k, s in enumerate(self.seeds):
+                rng = np.random.default_rng(s)
+                clicks[k] = rng.integers(0, w), rng.integers(0, h)
+                keys[k] = rng.random(h * w)
+        xs = np.asarray(clicks[:, 0] if xs is None else xs)
+        ys = np.asarray(clicks[:, 1] if ys is None else ys)
+
+        # Clés aléatoires ; les cases interdites passent en dernier. Les num_mines
+        # plus petites clés de chaque ligne sont les mines (tirage sans remise)
+        yy, xx = np.indices((h, w))
+        excluded = (np.abs(xx - xs[:, None, None]) <= 1) & (np.abs(yy - ys[:, None, None]) <= 1)
+        keys[excluded.reshape(n, -1)] = 2.0
+        chosen = np.argpartition(keys, self.num_mines - 1, axis=1)[:, :self.num_mines]
+        flat = np.zeros((n, h * w), dtype=bool)
+        np.put_along_axis(flat, chosen, True, axis=1)
+        self.mines = flat.reshape(n, h, w)
+
+        self.counts = neighbor_sum(self.mines)
+        self.counts[self.mines] = -1
+        self.started = True
+
+        first = np.zeros((n, h, w), dtype=bool)
+        first[np.arange(n), ys, xs] = True
+        self.moves += 1
+        return self.reveal(np.arange(n), first)
+
+    def active(self):
+        """Indices des parties en cours"""
+        return np.flatnonzero(self.status == PLAYING)
+
+    def reveal(self, slots, mask):
+        """Révèle les cases de `mask` (len(slots), H, W) dans les parties `slots`.
+        Retourne les cases nouvellement révélées"""
+        slots = np.asarray(slots)
+        playing = self.status[slots] == PLAYING
+        opened = np.zeros_like(mask)
+        if playing.any():
+            opened[playing] = self._reveal(slots[playing], mask[playing])
+        return opened
+
+    def reveal_cells(self, i, x, y):
+        """Révèle une case de la partie i. Retourne (boom, cases_nouvellement_révélées)"""
+        if not self.started:
+            raise ValueError("start() doit être appelé avant de révéler une case")
+        if self.status[i] != PLAYING or self.flags[i, y, x] or self.revealed[i, y, x]:
+            return False, set()
+        mask = np.zeros((1, self.height, self.width), dtype=bool)
+        mask[0, y, x] = True
+        opened = self._reveal(np.array([i]), mask)[0]
+        ys, xs = np.nonzero(opened)
+        return self.status[i] == LOST, set(zip(xs.tolist(), ys.tolist()))
+
+    def flag(self, slots, mask):
+        """Pose les drapeaux de `mask` (len(slots), H, W) dans les parties `slots`"""
+        slots = np.asarray(slots)
+        new = mask & ~self.flags[slots] & ~self.revealed[slots]
+        self.flags[slots] |= new
+        for k, i in enumerate(slots.tolist()):
+            view = self._views.get(i)
+            if view is not None and new[k].any():
+                ys, xs = np.nonzero(new[k])
+                view.flags.update(zip(xs.tolist(), ys.tolist()))
+
+    def _reveal(self, slots, mask):
+        """Révélation + flood fill sur les parties `slots` (mask : (len(slots), H, W))"""
+        revealed = self.revealed[slots]
+        flags = self.flags[slots]
+        counts = self.counts[slots]
+        mines = self.mines[slots]
+        mask = mask & ~revealed & ~flags
+
+        # Une mine touchée fait perdre la partie (toutes ses mines sont alors révélées)
+        hit = mask & mines
+        boom = hit.any(axis=(1, 2))
+        mask[boom] |= mines[boom]
+        opened = mask.copy()
+        revealed |= mask
+
+        # Flood fill par dilatations successives : les voisines cachées d'un 0 qui
+        # vient d'être ouvert sont ouvertes à leur tour, jusqu'à stabilité.
+        # Seules les parties encore en expansion sont traitées à chaque étape
+        new = mask & ~boom[:, None, None]
+        while True:
+            zeros = new & (counts == 0)
+            growing = np.flatnonzero(zeros.any(axis=(1, 2)))
+            if not len(growing): break
+            grow = (neighbor_sum(zeros[growing]) > 0) & ~revealed[growing] & ~flags[growing]
+            revealed[growing] |= grow
+            opened[growing] |= grow
+            new = np.zeros_like(new)
+            new[growing] = grow
+
+        self.revealed[slots] = revealed
+        h, w = self.height, self.width
+        left = h * w - self.num_mines - revealed.sum(axis=(1, 2))
+        status = np.where(boom, LOST, np.where(left == 0, WON, PLAYING))
+        self.status[slots] = status
+
+        for k, i in enumerate(slots.tolist()):
+            view = self._views.get(i)
+            if view is not None and opened[k].any():
+                ys, xs = np.nonzero(opened[k])
+                cells = list(zip(xs.tolist(), ys.tolist()))
+                view.revealed.update(cells)
+                view.reveal_log.extend(cells)
+                view.safe_left = int(left[k])
+                if boom[k]:
+                    ys, xs = np.nonzero(hit[k])
+                    view.killer_move = (int(xs[0]), int(ys[0]))
+        return opened
+
+    def simple_logic(self, slots=None):
+        """Règles sur une seule case, pour toutes les parties `slots` à la fois
+        (par défaut celles en cours). Retourne (sûres, mines) en masques (len(slots), H, W)"""
+        if slots is None: slots = self.active()
+        revealed = self.revealed[slots]
+        flags = self.flags[slots]
+        counts = self.counts[slots]
+        hidden = ~revealed & ~flags
+        hidden_around = neighbor_sum(hidden)
+        numbers = revealed & (counts > 0) & (hidden_around > 0)
+        numbers &= (self.status[slots] == PLAYING)[:, None, None]
+        remaining = counts - neighbor_sum(flags)
+
+        # Chiffre atteint : voisines sûres ; chiffre = cases cachées : voisines minées
+        safe_src = numbers & (remaining == 0)
+        mine_src = numbers & (remaining == hidden_around)
+        safe = (neighbor_sum(safe_src) > 0) & hidden
+        mines = (neighbor_sum(mine_src) > 0) & hidden
+        return safe, mines
+
+    def view(self, i):
+        """Minesweeper branché sur la partie i (même objet à chaque appel)"""
+        view = self._views.get(i)
+        if view is None:
+            view = BoardView(self, i)
+            self._views[i] = view
+        return view
+
+    def release(self, i):
+        """Oublie la vue de la partie i (partie terminée)"""
+        self._views.pop(i, None)
+
+
+class BoardView(Minesweeper):
+    """Une partie d'un BatchMinesweeper vue comme un Minesweeper classique.
+    Les lectures (revealed, flags, safe_left, get_value...) sont tenues à jour par
+    le lot ; reveal(), flag() et apply() passent par le lot."""
+    def __init__(self, batch, slot):
+        super().__init__(batch.width, batch.height, batch.num_mines)
+        self.batch = batch
+        self.slot = slot
+        if batch.started:
+            ys, xs = np.nonzero(batch.mines[slot])
+            self.grid = set(zip(xs.tolist(), ys.tolist()))
+            self.first_click = False
+            self.counts = array('b', batch.counts[slot].tobytes())
+        ys, xs = np.nonzero(batch.revealed[slot])
+        self.revealed.update(zip(xs.tolist(), ys.tolist()))
+        self.safe_left = batch.width * batch.height - batch.num_mines - len(self.revealed)
+        self.reveal_log.extend(self.revealed)
+        ys, xs = np.nonzero(batch.flags[slot])
+        self.flags.update(zip(xs.tolist(), ys.tolist()))
+
+    def reveal_cells(self, x, y):
+        return self.batch.reveal_cells(self.slot, x, y)
+
+    def won(self):
+        return self.batch.status[self.slot] == WON
+
+    def lost(self):
+        return self.batch.status[self.slot] == LOST
+
+    def flag(self, x, y):
+        self.batch.flags[self.slot, y, x] = True
+        self.flags.add((x, y))
+
+    def apply(self, safe, mines):
+        """Minesweeper.apply() dont les drapeaux et les révélations passent par le lot"""
+        flagged = []
+        for (x, y) in mines:
+            if (x, y) not in self.flags and (x, y) not in self.revealed:
+                self.flag(x, y)
+                flagged.append((x, y))
+        # reveal_cells() complète reveal_log (cf. BatchMinesweeper._reveal)
+        start = len(self.reveal_log)
+        boom = None
+        for (x, y) in safe:
+            if (x, y) in self.revealed or (x, y) in self.flags: continue
+            hit, _ = self.reveal_cells(x, y)
+            if hit:
+                boom = (x, y)
+                break
+        return MoveDelta(self.reveal_log[start:], flagged, boom)
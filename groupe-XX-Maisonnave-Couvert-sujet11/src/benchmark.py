@@ -1,83 +1,412 @@
-import time
+import argparse
+import json
+import os
+import random
 import sys
+import time
 from game_engine import Minesweeper
 from csp_solver import CSPSolver
+from instrumentation import Stats
+from replay import ReplayRecorder
 
-# Configuration du test
-N_SIMULATIONS = 1000  # Commence par 100 pour tester, on peut augmenter à 1000  pour plus de précision. 
+# Configuration par défaut du test (modifiable en ligne de commande, cf. --help)
+N_SIMULATIONS = 1000  # Commence par 100 pour tester, on peut augmenter à 1000  pour plus de précision.
 WIDTH = 15
 HEIGHT = 15
 MINES = 30
- 
-def run_benchmark():
-    print(f"🚀 Démarrage du Benchmark : {N_SIMULATIONS} parties ({WIDTH}x{HEIGHT}, {MINES} mines)")
+COMPACT = False # Plateau compact (tableaux plats) : utile pour les très grandes grilles
+SEED = 0 # La partie i utilise la graine SEED + i : mêmes graines => mêmes résultats
+BATCH_CHUNK_MAX = 1000 # --batch : parties par lot au plus (mémoire d'un lot proportionnelle à sa taille)
+
+# Scénarios de la suite (--suite) : taille, mines et nombre de parties par défaut
+SCENARIOS = {
+    'beginner':     {'width': 9,   'height': 9,   'mines': 10,   'games': 500},
+    'intermediate': {'width': 16,  'height': 16,  'mines': 40,   'games': 300},
+    'expert':       {'width': 30,  'height': 16,  'mines': 99,   'games': 200},
+    'huge_sparse':  {'width': 200, 'height': 200, 'mines': 2000, 'games': 20},
+    'huge_dense':   {'width': 100, 'height': 100, 'mines': 2000, 'games': 20},
+}
+PHASES = ("simple", "propagation", "backtracking", "guess")
+
+def play_game(seed, width=WIDTH, height=HEIGHT, mines=MINES, compact=COMPACT, stats=None, move_times=None,
+              solver_options=None, recorder=None):
+    """Joue une partie complète sans GUI. Retourne (victoire, nombre de coups).
+    `stats` (instrumentation.Stats) est branché sur le moteur et l'IA ; la durée de
+    chaque appel à solve() est ajoutée à la liste `move_times` si elle est fournie.
+    `solver_options` est passé à CSPSolver (time_budget, node_budget...).
+    `recorder` (replay.ReplayRecorder) reçoit les coups joués."""
+    # Un générateur par partie, partagé par le moteur (mines) et l'IA (choix au hasard)
+    rng = random.Random(seed)
+
+    # 1. Création de la partie (Sans GUI)
+    game = Minesweeper(width=width, height=height, num_mines=mines, compact=compact, rng=rng, stats=stats)
+
+    # 2. IA en mode silencieux (verbose=False)
+    solver = CSPSolver(game, verbose=False, rng=rng, stats=stats, **(solver_options or {}))
+    if recorder is not None: recorder.game = game
+
+    moves_count = 0
+    while True:
+        # Vérification Victoire (compteur tenu par le moteur)
+        if game.won():
+            return True, moves_count
+
+        # Demander à l'IA
+        if move_times is None:
+            safe, mines = solver.solve()
+        else:
+            start = time.perf_counter()
+            safe, mines = solver.solve()
+            move_times.append(time.perf_counter() - start)
+        if stats is not None: stats.count(f"moves_{solver.last_phase}")
+        moves_count += 1
+
+        # Si l'IA est bloquée (ne devrait pas arriver avec les probas, mais sécurité)
+        if not safe and not mines:
+            return False, moves_count # Considéré comme défaite ou abandon
+
+        # Appliquer drapeaux et révélations d'un bloc
+        delta = game.apply(safe, mines)
+        if recorder is not None: recorder.record(safe, delta, solver.last_phase)
+        if delta.boom is not None:
+            return False, moves_count
+
+def play_batch(seeds, width=WIDTH, height=HEIGHT, mines=MINES, solver_options=None):
+    """Joue une partie par graine de `seeds`, toutes d'un coup, avec le moteur vectorisé (batch_engine).
+    La graine d'une partie fixe sa grille et les choix de son solveur : résultats
+    identiques quel que soit le découpage en lots.
+    À chaque tour, la logique simple est appliquée à tout le lot ; les parties
+    bloquées demandent un coup à leur CSPSolver (branché sur la vue de la partie),
+    et tous ces coups sont appliqués ensemble. Retourne (victoires, coups)."""
+    import numpy as np
+    from batch_engine import BatchMinesweeper, LOST, WON
+
+    batch = BatchMinesweeper(len(seeds), width, height, mines, seeds=seeds)
+    batch.start()
+    solvers = {}
+    live = batch.active()
+    while len(live):
+        # 1. Logique simple, vectorisée sur toutes les parties en cours
+        safe, flags = batch.simple_logic(live)
+        progress = (safe | flags).any(axis=(1, 2))
+        batch.moves[live[progress]] += 1
+        batch.flag(live, flags)
+        batch.reveal(live, safe)
+
+        # 2. Parties bloquées : un coup du solveur complet chacune
+        stuck = live[~progress]
+        if len(stuck):
+            safe = np.zeros((len(stuck), height, width), dtype=bool)
+            flags = np.zeros_like(safe)
+            for k, i in enumerate(stuck.tolist()):
+                solver = solvers.get(i)
+                if solver is None:
+                    solver = solvers[i] = CSPSolver(batch.view(i), verbose=False, rng=random.Random(seeds[i]),
+                                                    **(solver_options or {}))
+                moves, flagged = solver.solve()
+                batch.moves[i] += 1
+                if not moves and not flagged:
+                    batch.status[i] = LOST # IA bloquée : abandon
+                    continue
+                for (x, y) in flagged: flags[k, y, x] = True
+                for (x, y) in moves: safe[k, y, x] = True
+            batch.flag(stuck, flags)
+            batch.reveal(stuck, safe)
+        ended = live
+        live = batch.active()
+        # Parties terminées : solveur et vue libérés tout de suite (mémoire bornée par les parties en cours)
+        for i in np.setdiff1d(ended, live).tolist():
+            if solvers.pop(i, None) is not None: batch.release(i)
+    return int((batch.status == WON).sum()), int(batch.moves.sum())
+
+def _play_chunk(task):
+    """Joue un paquet de parties (exécuté dans un processus du pool)"""
+    first, last, config = task
+    record_dir = config.get('record_dir')
+    if config.get('batch'):
+        # Un lot par paquet ; la partie i garde sa graine seed + i
+        seeds = [config['seed'] + i for i in range(first, last)]
+        wins, moves = play_batch(seeds, config['width'], config['height'], config['mines'], config.get('solver'))
+        return last - first, wins, moves
+    wins = 0
+    moves = 0
+    for i in range(first, last):
+        seed = config['seed'] + i
+        recorder = ReplayRecorder(seed=seed) if record_dir else None
+        won, n = play_game(seed, config['width'], config['height'],
+                           config['mines'], config['compact'], solver_options=config.get('solver'), recorder=recorder)
+        if recorder is not None and not won and recorder.game.killer_move is not None:
+            # Défaite : journal rejouable avec replay.py (une défaite = un fichier)
+            recorder.save(os.path.join(record_dir, f"loss_{seed}.jsonl"))
+        wins += won
+        moves += n
+    return last - first, wins, moves
+
+def run_benchmark(n_games=N_SIMULATIONS, width=WIDTH, height=HEIGHT, mines=MINES,
+                  compact=COMPACT, seed=SEED, workers=None, chunk_size=None, progress=True,
+                  solver_options=None, batch=False, record_dir=None):
+    """Répartit les parties sur un pool de processus et fusionne les résultats.
+    Retourne un dict (victoires, défaites, coups, temps...)"""
+    if batch and record_dir:
+        raise ValueError("record_dir : pas de journal de défaite en mode vectorisé (batch)")
+    workers = workers or os.cpu_count() or 1
+    # Paquets assez gros pour amortir l'envoi aux processus, assez petits pour bien répartir
+    if batch:
+        # Moteur vectorisé : des lots gros, un par processus, mais bornés (chaque partie
+        # du lot garde ses tableaux jusqu'à la fin du lot)
+        chunk_size = chunk_size or max(1, min(BATCH_CHUNK_MAX, -(-n_games // workers)))
+    chunk_size = chunk_size or max(1, min(1000, n_games // (workers * 8) or 1))
+    config = {'seed': seed, 'width': width, 'height': height, 'mines': mines, 'compact': compact,
+              'solver': solver_options, 'batch': batch, 'record_dir': record_dir}
+    if record_dir: os.makedirs(record_dir, exist_ok=True)
+    tasks = [(i, min(i + chunk_size, n_games), config) for i in range(0, n_games, chunk_size)]
+
+    print(f"🚀 Démarrage du Benchmark : {n_games} parties ({width}x{height}, {mines} mines)")
+    print(f"   {workers} processus, paquets de {chunk_size} parties, graine {seed}")
     print("-" * 60)
 
     wins = 0
-    losses = 0
+    moves = 0
+    done = 0
     start_global = time.time()
-    
-    # Barre de chargement simple
-    for i in range(1, N_SIMULATIONS + 1):
-        # 1. Création de la partie (Sans GUI)
-        game = Minesweeper(width=WIDTH, height=HEIGHT, num_mines=MINES)
-        
-        # 2. IA en mode silencieux (verbose=False)
-        solver = CSPSolver(game, verbose=False) 
-        
-        game_over = False
-        moves_count = 0
-        
-        while not game_over:
-            # Vérification Victoire
-            if len(game.revealed) + len(game.grid) == game.width * game.height:
-                wins += 1
-                game_over = True
-                break
-            
-            # Demander à l'IA
-            safe, mines = solver.solve()
-            moves_count += 1
-            
-            # Si l'IA est bloquée (ne devrait pas arriver avec les probas, mais sécurité)
-            if not safe and not mines:
-                losses += 1 # Considéré comme défaite ou abandon
-                break
-
-            # Appliquer les drapeaux
-            for m in mines: game.flags.add(m)
-            
-            # Appliquer les révélations
-            for (x, y) in safe:
-                if (x, y) not in game.revealed:
-                    boom = game.reveal(x, y)
-                    if boom:
-                        losses += 1
-                        game_over = True
-                        break # Sort de la boucle for
-            
-            # Sécurité boucle infinie (si l'IA ne joue rien)
-            if not safe and not mines:
-                 break
-
-        # Mise à jour barre de progression
-        percent = (i / N_SIMULATIONS) * 100
-        sys.stdout.write(f"\rProgression : [{('=' * int(percent // 2)).ljust(50)}] {i}/{N_SIMULATIONS} ({percent:.1f}%)")
-        sys.stdout.flush()
+
+    def on_result(result):
+        nonlocal wins, moves, done
+        n, w, m = result
+        done += n
+        wins += w
+        moves += m
+        if progress:
+            # Mise à jour barre de progression (une fois par paquet)
+            percent = (done / n_games) * 100
+            sys.stdout.write(f"\rProgression : [{('=' * int(percent // 2)).ljust(50)}] {done}/{n_games} ({percent:.1f}%)")
+            sys.stdout.flush()
+
+    if workers == 1:
+        for task in tasks:
+            on_result(_play_chunk(task))
+    else:
+        # L'ordre d'arrivée des paquets n'a pas d'importance : on ne fait que des sommes
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            for result in pool.imap_unordered(_play_chunk, tasks):
+                on_result(result)
 
     total_time = time.time() - start_global
-    win_rate = (wins / N_SIMULATIONS) * 100
-    avg_time = total_time / N_SIMULATIONS
+    return {
+        'games': n_games, 'wins': wins, 'losses': n_games - wins, 'moves': moves,
+        'total_time': total_time, 'workers': workers, 'chunk_size': chunk_size, 'seed': seed,
+    }
+
+def _play_scenario_chunk(task):
+    """Joue un paquet de parties en mesurant chaque coup (exécuté dans le pool)"""
+    first, last, config = task
+    records = []
+    for i in range(first, last):
+        stats = Stats()
+        move_times = []
+        start = time.perf_counter()
+        won, moves = play_game(config['seed'] + i, config['width'], config['height'],
+                               config['mines'], config['compact'], stats, move_times, config.get('solver'))
+        records.append({'won': won, 'moves': moves, 'game_time': time.perf_counter() - start,
+                        'move_times': move_times, 'stats': stats.snapshot()})
+    return records
+
+def _percentiles(values):
+    """p50 / p95 / p99 (rang le plus proche), en millisecondes"""
+    if not values: return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    values = sorted(values)
+    def pick(q):
+        return values[min(len(values) - 1, int(q * len(values)))] * 1000
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+def summarize(records):
+    """Agrège les parties d'un scénario : taux de victoire, percentiles, phases, nœuds"""
+    n_games = len(records)
+    wins = sum(r['won'] for r in records)
+    move_times = [t for r in records for t in r['move_times']]
+    stats = Stats()
+    for r in records:
+        stats.merge(r['stats'])
+    snapshot = stats.snapshot()
+
+    # Temps réellement passé dans chaque phase de solve() (chronomètres de l'instrumentation)
+    phase_times = {phase: snapshot['timers'].get(f"phase_{phase}", {'seconds': 0.0})['seconds'] for phase in PHASES}
+    total_phases = sum(phase_times.values()) or 1.0
+    phases = {}
+    for phase in PHASES:
+        phases[phase] = {
+            'moves': snapshot['counters'].get(f"moves_{phase}", 0),
+            'time_s': phase_times[phase],
+            'share': phase_times[phase] / total_phases,
+        }
+    nodes = snapshot['counters'].get("search_nodes", 0)
+    return {
+        'games': n_games, 'wins': wins, 'win_rate': wins / n_games if n_games else 0.0,
+        'moves': len(move_times),
+        'move_ms': _percentiles(move_times),
+        'game_ms': _percentiles([r['game_time'] for r in records]),
+        'phases': phases,
+        'bt_nodes': nodes, 'bt_nodes_per_game': nodes / n_games if n_games else 0.0,
+        'stats': snapshot,
+    }
+
+def run_suite(names=None, games=None, seed=SEED, workers=None, chunk_size=None, compact=COMPACT,
+              solver_options=None):
+    """Joue chaque scénario nommé et retourne les résultats (meta + résumé par scénario)"""
+    workers = workers or os.cpu_count() or 1
+    results = {'meta': _metadata(seed, workers, solver_options), 'scenarios': {}}
+    for name in names or SCENARIOS:
+        scenario = SCENARIOS[name]
+        n_games = games or scenario['games']
+        size = chunk_size or max(1, n_games // (workers * 4))
+        config = {'seed': seed, 'width': scenario['width'], 'height': scenario['height'],
+                  'mines': scenario['mines'], 'compact': compact, 'solver': solver_options}
+        tasks = [(i, min(i + size, n_games), config) for i in range(0, n_games, size)]
+
+        print(f"▶️ {name} : {n_games} parties ({scenario['width']}x{scenario['height']}, {scenario['mines']} mines)")
+        records = []
+        if workers == 1:
+            for task in tasks: records.extend(_play_scenario_chunk(task))
+        else:
+            from multiprocessing import Pool
+            with Pool(workers) as pool:
+                for chunk in pool.imap_unordered(_play_scenario_chunk, tasks):
+                    records.extend(chunk)
+
+        summary = summarize(records)
+        summary.update(width=scenario['width'], height=scenario['height'], mines=scenario['mines'])
+        results['scenarios'][name] = summary
+        print(f"   🏆 {summary['win_rate']*100:.1f}%  ⏱️ coup p50/p95/p99 : "
+              f"{summary['move_ms']['p50']:.2f} / {summary['move_ms']['p95']:.2f} / {summary['move_ms']['p99']:.2f} ms")
+    return results
+
+def _metadata(seed, workers, solver_options=None):
+    """Contexte de la mesure, pour comparer des résultats entre commits"""
+    import platform
+    import subprocess
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'date': time.strftime("%Y-%m-%d %H:%M:%S"), 'seed': seed,
+            'workers': workers, 'solver': solver_options or {}, 'python': platform.python_version()}
+
+def _flatten(results):
+    """Une ligne par scénario (pour le CSV et la comparaison)"""
+    rows = []
+    for name, s in results['scenarios'].items():
+        row = {'scenario': name, 'games': s['games'], 'win_rate': s['win_rate'], 'moves': s['moves'],
+               'bt_nodes_per_game': s['bt_nodes_per_game']}
+        for key in ('move_ms', 'game_ms'):
+            for p, v in s[key].items():
+                row[f"{key}_{p}"] = v
+        for phase, info in s['phases'].items():
+            row[f"{phase}_moves"] = info['moves']
+            row[f"{phase}_share"] = info['share']
+        rows.append(row)
+    return rows
+
+def save_results(results, path):
+    """Écrit les résultats en JSON (complet) ou en CSV (une ligne par scénario)"""
+    if path.endswith(".csv"):
+        import csv
+        rows = _flatten(results)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['scenario'])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+    print(f"💾 Résultats écrits dans {path}")
+
+def compare_results(old_path, new_results):
+    """Rapport de comparaison avec un ancien fichier JSON (pandas si disponible)"""
+    with open(old_path) as f:
+        old = json.load(f)
+    columns = ('win_rate', 'move_ms_p50', 'move_ms_p95', 'move_ms_p99', 'game_ms_p50', 'bt_nodes_per_game')
+    old_rows = {r['scenario']: r for r in _flatten(old)}
+    lines = []
+    for row in _flatten(new_results):
+        before = old_rows.get(row['scenario'])
+        if before is None: continue
+        line = {'scenario': row['scenario']}
+        for col in columns:
+            line[f"{col}_old"] = before[col]
+            line[f"{col}_new"] = row[col]
+        lines.append(line)
+
+    print(f"\n📈 Comparaison avec {old_path} (commit {old['meta'].get('commit')})")
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        print(pd.DataFrame(lines).set_index('scenario').T.to_string(float_format=lambda v: f"{v:.4g}"))
+        return
+    for line in lines:
+        print(f"  {line['scenario']}")
+        for col in columns:
+            print(f"    {col:<20} {line[f'{col}_old']:>10.4g} -> {line[f'{col}_new']:>10.4g}")
+
+def print_results(results):
+    n_games = results['games']
+    win_rate = (results['wins'] / n_games) * 100
+    avg_time = results['total_time'] / n_games
 
     print("\n" + "-" * 60)
     print(f"📊 RÉSULTATS DU BENCHMARK")
     print("-" * 60)
-    print(f"✅ Victoires      : {wins}")
-    print(f"❌ Défaites       : {losses}")
+    print(f"✅ Victoires      : {results['wins']}")
+    print(f"❌ Défaites       : {results['losses']}")
     print(f"🏆 Taux de Succès : {win_rate:.2f}%")
-    print(f"⏱️ Temps Total    : {total_time:.2f} secondes")
+    print(f"⏱️ Temps Total    : {results['total_time']:.2f} secondes")
     print(f"⚡ Temps Moyen/Jeu: {avg_time:.4f} secondes")
     print("-" * 60)
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du Démineur IA (sans interface)")
+    parser.add_argument("--games", type=int, default=None, help=f"Nombre de parties (défaut : {N_SIMULATIONS}, ou celui de chaque scénario)")
+    parser.add_argument("--width", type=int, default=WIDTH, help="Largeur de la grille")
+    parser.add_argument("--height", type=int, default=HEIGHT, help="Hauteur de la grille")
+    parser.add_argument("--mines", type=int, default=MINES, help="Nombre de mines")
+    parser.add_argument("--compact", action="store_true", default=COMPACT, help="Plateau compact (tableaux plats)")
+    parser.add_argument("--seed", type=int, default=SEED, help="Graine de base (partie i : seed + i)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Parties par paquet envoyé à un processus")
+    parser.add_argument("--suite", nargs="*", choices=list(SCENARIOS), metavar="SCENARIO",
+                        help=f"Suite de scénarios détaillée (tous par défaut) : {', '.join(SCENARIOS)}")
+    parser.add_argument("--time-budget-ms", type=float, default=None, help="Budget de temps de l'IA par coup (ms)")
+    parser.add_argument("--node-budget", type=int, default=None, help="Budget de nœuds de recherche de l'IA par coup")
+    parser.add_argument("--samples", type=int, default=None, help="Tirages par composante trop grosse pour être énumérée (0 = estimation locale)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Moteur vectorisé : chaque paquet est joué d'un bloc (NumPy, grilles différentes du mode normal ; "
+                             "plus lent que le mode normal en expert)")
+    parser.add_argument("--record-losses", metavar="DOSSIER",
+                        help="Écrit le journal de chaque défaite (rejouable avec replay.py)")
+    parser.add_argument("--output", help="Fichier de résultats de la suite (.json ou .csv)")
+    parser.add_argument("--compare", help="Ancien résultat JSON de la suite à comparer")
+    args = parser.parse_args(argv)
+    if args.batch and args.record_losses:
+        parser.error("--record-losses n'est pas disponible avec --batch (pas de journal en mode vectorisé)")
+    solver_options = {}
+    if args.time_budget_ms is not None: solver_options['time_budget'] = args.time_budget_ms / 1000
+    if args.node_budget is not None: solver_options['node_budget'] = args.node_budget
+    if args.samples is not None: solver_options['samples'] = args.samples
+
+    if args.suite is not None:
+        results = run_suite(args.suite, args.games, args.seed, args.workers, args.chunk_size, args.compact,
+                            solver_options)
+        if args.output: save_results(results, args.output)
+        if args.compare: compare_results(args.compare, results)
+        return
+
+    results = run_benchmark(args.games or N_SIMULATIONS, args.width, args.height, args.mines, args.compact,
+                            args.seed, args.workers, args.chunk_size, solver_options=solver_options,
+                            batch=args.batch, record_dir=args.record_losses)
+    print_results(results)
+
 if __name__ == "__main__":
-    run_benchmark()
\ No newline at end of file
+    main()
@@ -0,0 +1,50 @@
+class ConstraintModel:
+    """Modèle compilé d'une composante, construit une fois par backtracking.
+
+    Les variables sont indexées par des entiers (ordre de `variables`), chaque
+    contrainte est une liste d'indices avec un nombre de mines cible. On tient à
+    jour, par contrainte, les mines déjà affectées et les variables encore
+    libres : affecter une variable ne touche que ses propres contraintes (O(degré)).
+    """
+    def __init__(self, variables, constraints, frontier):
+        self.variables = variables
+        index = {v: i for i, v in enumerate(variables)}
+        self.targets = [frontier.remaining[c] for c in constraints]
+        self.members = [[index[v] for v in frontier.hidden[c]] for c in constraints]
+
+        # Contraintes touchant chaque variable
+        self.var_constraints = [[] for _ in variables]
+        for c, members in enumerate(self.members):
+            for i in members:
+                self.var_constraints[i].append(c)
+
+        # Compteurs courants
+        self.mines = [0] * len(self.targets)
+        self.unknown = [len(members) for members in self.members]
+
+    def feasible(self):
+        """Vérifie que chaque contrainte est satisfaisable (avant toute affectation)"""
+        return all(0 <= t <= u for t, u in zip(self.targets, self.unknown))
+
+    def assign(self, i, value):
+        """Affecte la variable i. Retourne False si une de ses contraintes devient
+        impossible. Dans tous les cas, unassign(i, value) doit être appelé ensuite."""
+        ok = True
+        mines = self.mines
+        unknown = self.unknown
+        targets = self.targets
+        for c in self.var_constraints[i]:
+            unknown[c] -= 1
+            m = mines[c] + value
+            mines[c] = m
+            # Trop de mines, ou plus assez d'inconnues pour atteindre le chiffre
+            if m > targets[c] or m + unknown[c] < targets[c]:
+                ok = False
+        return ok
+
+    def unassign(self, i, value):
+        mines = self.mines
+        unknown = self.unknown
+        for c in self.var_constraints[i]:
+            unknown[c] += 1
+            mines[c] -= value
@@ -1,183 +1,412 @@
 import random
+import time
+from frontier import Frontier
+from constraint_model import ConstraintModel
+from propagation import propagate
+from probability import ComponentCounts, mine_probabilities
+from observation import HIDDEN
 
 class CSPSolver:
-    def __init__(self, game, verbose=True): # Ajout du paramètre verbose
+    def __init__(self, game, verbose=True, rng=None, stats=None, pattern_cache=None,
+                 time_budget=None, node_budget=None, samples=2000): # Ajout du paramètre verbose
         self.game = game
-        self.MAX_BACKTRACK_VARS = 14
+        self.rng = rng if rng is not None else random # Générateur pour les choix au hasard
+        self.MAX_BACKTRACK_VARS = 24
+        # Mode "anytime" : budget par appel à solve() (secondes / nœuds de recherche).
+        # Avec un budget, la limite de variables est remplacée par MAX_ANYTIME_VARS
+        # et la recherche s'arrête quand le budget est épuisé.
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.MAX_ANYTIME_VARS = 400
+        self._deadline = None
+        self._nodes_left = None
+        self._cancelled = False # cancel() depuis un autre thread (cf. solver_worker.py)
+        # Composantes déjà énumérées (pattern_cache.PatternCache, ou pattern_cache.shared_cache
+        # pour le partager entre parties). Désactivé par défaut : ~30 % de succès sur le
+        # benchmark, sans gain mesurable sur le backtracking
+        self.pattern_cache = pattern_cache
+        self.PATTERN_MIN_VARS = 10 # En dessous, énumérer coûte moins cher que de calculer la clé canonique
+        # Tirages par composante trop grosse pour être énumérée (cf. sampling.py, 0 pour désactiver)
+        self.samples = samples
+        # NumPy importé dès maintenant (~0,3 s) plutôt que pendant le premier pari, dans le budget
+        self._sampler = None
+        if samples:
+            try:
+                from sampling import sample_component
+                self._sampler = sample_component
+            except ImportError:
+                pass
+        # Coût d'un échantillonnage, surtout proportionnel au nombre de variables (une étape
+        # NumPy par variable) : secondes par variable (moyenne des derniers appels) et nœuds
+        # de recherche comptés par variable avec un budget en nœuds
+        self._sample_cost = 0.0004
+        self.SAMPLE_NODES_PER_VAR = 100
         self.verbose = verbose # On stocke l'info
+        self.frontier = Frontier() # Frontière mise à jour à partir des coups joués
+        # Observation (observation.Observation) lue par le dernier solve() : le solveur
+        # ne lit jamais la partie elle-même, seulement ce qu'en voit le joueur
+        self.view = None
+        self.prob_map = None # Probabilités du dernier pari
+        # Résultats du dernier backtracking, réutilisés pour les probabilités
+        self._component_counts = []
+        self._skipped = [] # Variables des composantes non énumérées
+        # Phase qui a produit le dernier coup ("simple", "propagation", "backtracking", "guess")
+        self.last_phase = None
+        # Risque d'une case hors frontière au dernier pari (None si inconnu)
+        self.interior_prob = None
+        # Instrumentation (instrumentation.Stats), désactivée par défaut
+        self.stats = stats
 
-    def solve(self):
-        moves = set()
-        flags = set()
+    def solve(self, view=None):
+        """Coups pour l'observation `view` (par défaut game.observe()) : (sûres, mines)"""
+        frontier = self.frontier
+        stats = self.stats
+        self._start_budget()
+        self.view = view if view is not None else self.game.observe()
+        frontier.sync(self.view)
+        if stats is not None:
+            stats.count("solve_calls")
+            stats.observe("frontier_size", len(frontier.var_constraints))
         
         # --- 1. LOGIQUE SIMPLE (Rapide) ---
-        simple_found = False
-        for (x, y) in list(self.game.revealed):
-            val = self.game.get_value(x, y)
-            if val == 0: continue 
-
-            neighbors = self.game.get_neighbors(x, y)
-            hidden = [n for n in neighbors if n not in self.game.revealed and n not in self.game.flags]
-            flagged = [n for n in neighbors if n in self.game.flags]
-            
-            if not hidden: continue
-
-            # Si le nombre de drapeaux = le chiffre, le reste est sûr
-            if len(flagged) == val:
-                for n in hidden:
-                    moves.add(n)
-                    simple_found = True
-
-            # Si le nombre de cases cachées + drapeaux = le chiffre, tout est mine
-            elif len(hidden) + len(flagged) == val:
-                for n in hidden:
-                    flags.add(n)
-                    simple_found = True
-
-        if simple_found:
+        moves, flags = self._timed("simple", self._run_simple_logic)
+        if moves or flags:
             # On ne print pas ici pour ne pas spammer la console quand c'est facile
+            self.last_phase = "simple"
             return list(moves), list(flags)
 
-        # --- 2. BACKTRACKING INTELLIGENT (Expert) ---
+        # --- 2. PROPAGATION DE CONTRAINTES (Sous-ensembles, paires) ---
+        # Polynomiale : résout les motifs classiques (1-2-1, 1-1 contre un mur) sans backtracking
+        prop_moves, prop_flags = self._timed("propagation", propagate, frontier)
+        if prop_moves or prop_flags:
+            self.last_phase = "propagation"
+            if self.verbose: print(f"🧩 PROPAGATION : {len(prop_moves)} sûres, {len(prop_flags)} mines par croisement de contraintes.")
+            return prop_moves, prop_flags
+
+        # --- 3. BACKTRACKING INTELLIGENT (Expert) ---
         if self.verbose: print("🔍 Logique simple épuisée. Tentative de Backtracking...")
-        bt_moves, bt_flags = self._run_backtracking()
+        bt_moves, bt_flags = self._timed("backtracking", self._run_backtracking)
         
         if bt_moves or bt_flags:
+            self.last_phase = "backtracking"
             if self.verbose: print(f"✨ BACKTRACKING SUCCÈS : {len(bt_moves)} sûres, {len(bt_flags)} mines identifiées par déduction complexe.")
             return list(bt_moves), list(bt_flags)
         
         if self.verbose: print("❌ Backtracking : Aucune certitude absolue trouvée (situation ambiguë).")
 
-        # --- 3. PROBABILITÉS (Dernier recours) ---
+        # --- 4. PROBABILITÉS (Dernier recours) ---
+        self.last_phase = "guess"
         if self.verbose: print("🤔 Passage aux probabilités...")
+        if stats is not None: stats.count("guesses")
         
-        best_guess = self._get_safest_guess()
+        best_guess = self._timed("guess", self._get_safest_guess)
         if best_guess:
-            moves.add(best_guess)
-        
-        return list(moves), list(flags)
+            return [best_guess], []
+        return [], []
+
+    def _timed(self, phase, func, *args):
+        """Exécute une phase de solve() ; chronométrée seulement si l'instrumentation est active"""
+        stats = self.stats
+        if stats is None:
+            return func(*args)
+        stats.emit("phase_enter", phase=phase)
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        stats.add_time(f"phase_{phase}", elapsed)
+        stats.emit("phase_exit", phase=phase, seconds=elapsed, result=result)
+        return result
+
+    def _run_simple_logic(self):
+        """Règles sur une seule case. Seules les contraintes modifiées depuis le dernier
+        appel peuvent donner du nouveau. Retourne (sûres, mines)"""
+        frontier = self.frontier
+        moves = set()
+        flags = set()
+        for c in list(frontier.dirty):
+            hidden = frontier.hidden[c]
+            remaining = frontier.remaining[c]
+
+            # Si le nombre de drapeaux = le chiffre, le reste est sûr
+            if remaining == 0:
+                moves.update(hidden)
+
+            # Si le nombre de cases cachées + drapeaux = le chiffre, tout est mine
+            elif remaining == len(hidden):
+                flags.update(hidden)
+
+            # Rien à tirer de cette contrainte tant qu'elle ne change pas
+            # (celles qui ont produit un coup restent marquées jusqu'à son application)
+            else:
+                frontier.dirty.discard(c)
+        return moves, flags
+
+    def cancel(self):
+        """Interrompt au plus tôt le solve() en cours (le résultat est alors à ignorer).
+        Reste en vigueur, y compris pour les solve() suivants, jusqu'à resume()"""
+        self._cancelled = True
+
+    def resume(self):
+        """Autorise de nouveau la recherche après cancel()"""
+        self._cancelled = False
+
+    def _start_budget(self):
+        self._deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        self._nodes_left = self.node_budget
+
+    def _has_budget(self):
+        return self._deadline is not None or self._nodes_left is not None
+
+    def _budget_exhausted(self):
+        if self._cancelled: return True
+        if self._nodes_left is not None and self._nodes_left <= 0: return True
+        return self._deadline is not None and time.perf_counter() > self._deadline
 
     def _run_backtracking(self):
-        """Teste toutes les combinaisons possibles sur la frontière"""
-        boundary_vars = set()
-        constraints = set()
-        
-        # Récupération de la frontière active
-        for (x, y) in self.game.revealed:
-            val = self.game.get_value(x, y)
-            if val == 0: continue
-            hidden = [n for n in self.game.get_neighbors(x, y) 
-                      if n not in self.game.revealed and n not in self.game.flags]
-            if hidden:
-                for h in hidden: boundary_vars.add(h)
-                constraints.add((x, y))
-        
-        boundary_list = list(boundary_vars)
-        if not boundary_list: return [], []
-        
-        # Sécurité pour ne pas planter le PC
-        if len(boundary_list) > self.MAX_BACKTRACK_VARS:
-            if self.verbose: print(f"   -> Trop complexe ({len(boundary_list)} vars). Abandon du backtracking.")
-            return [], []
+        """Teste toutes les combinaisons possibles sur la frontière, composante par composante"""
+        # Frontière active (déjà à jour, cf. solve), découpée en îlots indépendants :
+        # le coût devient la somme des 2^k par composante au lieu de 2^N.
+        # Les plus petites d'abord : avec un budget, on résout le maximum de composantes
+        self._component_counts = []
+        self._skipped = []
+        components = self.frontier.components()
+        if not components: return [], []
+        components.sort(key=lambda component: len(component[0]))
+        max_vars = self.MAX_ANYTIME_VARS if self._has_budget() else self.MAX_BACKTRACK_VARS
+        if self.stats is not None: self.stats.observe("components", len(components))
+        if self.verbose and len(components) > 1: print(f"   -> {len(components)} composantes indépendantes.")
+
+        confirmed_safe = []
+        confirmed_mines = []
+        for boundary_list, constraints in components:
+            # Sécurité pour ne pas planter le PC (limite appliquée par composante)
+            if len(boundary_list) > max_vars or self._budget_exhausted():
+                if self.verbose: print(f"   -> Composante trop complexe ou budget épuisé ({len(boundary_list)} vars). Ignorée.")
+                self._skipped.append(boundary_list)
+                continue
+
+            counts = self._solve_component(boundary_list, constraints, stop_early=True)
+            if counts is None: continue
+            self._component_counts.append(counts)
+            if not counts.complete: continue
+
+            safe, mines = counts.certainties()
+            confirmed_safe.extend(safe)
+            confirmed_mines.extend(mines)
 
-        valid_solutions = []
+        return confirmed_safe, confirmed_mines
+
+    def _solve_component(self, boundary_list, constraints, stop_early=False):
+        """Énumère les solutions d'une composante, regroupées par nombre de mines.
+        Avec stop_early, s'arrête dès qu'aucune variable ne peut plus être certaine
+        (le résultat est alors marqué incomplet)."""
+        # Motif déjà rencontré (à une symétrie près) : pas de nouvelle recherche
+        cache = self.pattern_cache
+        pattern = None
+        if cache is not None and len(boundary_list) >= self.PATTERN_MIN_VARS:
+            pattern = cache.canonical(boundary_list, constraints, self.frontier)
+            cached = cache.get(pattern[0], pattern[1], boundary_list)
+            if self.stats is not None: self.stats.count("pattern_hits" if cached else "pattern_misses")
+            if cached is not None: return cached
+
+        # Modèle compilé une fois : chaque nœud ne vérifie que les contraintes de la variable posée
+        model = ConstraintModel(boundary_list, constraints, self.frontier)
+        if not model.feasible(): return None
+
+        n = len(boundary_list)
+        values = [0] * n
+        # Comptes cumulés au fil de l'eau : mémoire constante quel que soit le nombre de solutions
+        counts = ComponentCounts(boundary_list)
+        first = []            # Première solution trouvée
+        varied = [False] * n  # La variable a déjà pris deux valeurs différentes
+        n_varied = 0
+        nodes = 0
+        checks = 0 # Appels à model.assign (tests de cohérence)
+        # Budget : vérifié tous les 256 nœuds seulement
+        budgeted = self._has_budget()
+        node_limit = self._nodes_left
+        aborted = False
         
-        def solve_recursive(index, current_assignment):
-            # Optimisation (Pruning)
-            if not self._is_consistent(current_assignment, constraints): return
-
-            if index == len(boundary_list):
-                valid_solutions.append(current_assignment.copy())
-                return
-
-            var = boundary_list[index]
-            
-            # Hypothèse 0 : Pas de mine
-            current_assignment[var] = 0
-            solve_recursive(index + 1, current_assignment)
-            
-            # Hypothèse 1 : Mine
-            current_assignment[var] = 1
-            solve_recursive(index + 1, current_assignment)
-            
-            del current_assignment[var] # Backtrack
-
-        solve_recursive(0, {})
+        def search():
+            """Parcours en profondeur avec une pile implicite (tried) au lieu de la récursion :
+            aucune limite de profondeur, même dans le thread du solveur.
+            Retourne False si la recherche a été interrompue"""
+            nonlocal n_varied, nodes, checks, aborted
+            tried = [-1] * n # Dernière valeur essayée à chaque profondeur
+            index = 0
+            entering = True  # Arrivée sur un nouveau nœud (sinon : retour d'un fils)
+            while True:
+                if entering:
+                    nodes += 1
+                    if nodes & 255 == 0 and (budgeted or self._cancelled):
+                        if self._cancelled or (node_limit is not None and nodes >= node_limit) or \
+                                (self._deadline is not None and time.perf_counter() > self._deadline):
+                            aborted = True
+                            return False
+                    if index == n:
+                        counts.add(values)
+                        if stop_early:
+                            if not first:
+                                first.extend(values)
+                            else:
+                                for i in range(n):
+                                    if not varied[i] and values[i] != first[i]:
+                                        varied[i] = True
+                                        n_varied += 1
+                                if n_varied == n: return False # Plus aucune certitude possible
+                    else:
+                        tried[index] = -1
+
+                if index == n or tried[index] == 1:
+                    # Les deux hypothèses ont été explorées : retour au parent (backtrack)
+                    index -= 1
+                    if index < 0: return True
+                    model.unassign(index, values[index])
+                    entering = False
+                    continue
+
+                # Hypothèse 0 : Pas de mine, puis Hypothèse 1 : Mine
+                value = tried[index] + 1
+                tried[index] = value
+                checks += 1
+                # Optimisation (Pruning)
+                if model.assign(index, value):
+                    values[index] = value
+                    index += 1
+                    entering = True
+                else:
+                    model.unassign(index, value)
+                    entering = False
+
+        counts.complete = search()
+        if self._nodes_left is not None: self._nodes_left -= nodes
+        if self.stats is not None:
+            self.stats.count("search_nodes", nodes)
+            self.stats.count("consistency_checks", checks)
         
-        if not valid_solutions: return [], []
+        if aborted:
+            # Budget épuisé : énumération partielle, ni certitude ni probabilité exacte
+            if self.stats is not None: self.stats.count("budget_aborts")
+            if self.verbose: print(f"   -> Budget épuisé ({n} vars), recherche abandonnée.")
+            counts.aborted = True
+            return counts
+        if not counts.totals: return None
+        if pattern is not None:
+            cache.put(pattern[0], pattern[1], counts)
+            if self.stats is not None: self.stats.observe("pattern_cache_bytes", cache.memory_bytes)
 
-        if self.verbose: print(f"   -> {len(valid_solutions)} scénarios valides calculés.")
+        if self.verbose:
+            if counts.complete: print(f"   -> {counts.total()} scénarios valides calculés ({n} vars).")
+            else: print(f"   -> Aucune certitude possible ({n} vars), recherche interrompue.")
 
-        # Analyse des résultats communs
-        confirmed_mines = []
-        confirmed_safe = []
-        for var in boundary_list:
-            is_always_mine = all(s[var] == 1 for s in valid_solutions)
-            is_never_mine = all(s[var] == 0 for s in valid_solutions)
-            
-            if is_always_mine: confirmed_mines.append(var)
-            elif is_never_mine: confirmed_safe.append(var)
-            
-        return confirmed_safe, confirmed_mines
+        return counts
+
+    def _sample_component(self, variables):
+        """Comptes estimés d'une composante (sampling.py), ou None (échantillonnage
+        désactivé, NumPy absent ou aucun tirage valide)"""
+        if not self.samples: return None
+        sample_component = self._sampler
+        if sample_component is None:
+            try:
+                from sampling import sample_component
+            except ImportError:
+                return None
+        n = len(variables)
+        # Budget : pas d'échantillonnage qui le dépasserait (estimation locale à la place)
+        if self._cancelled: return None
+        if self._nodes_left is not None:
+            if self._nodes_left < n * self.SAMPLE_NODES_PER_VAR: return None
+            self._nodes_left -= n * self.SAMPLE_NODES_PER_VAR
+        if self._deadline is not None and time.perf_counter() + n * self._sample_cost > self._deadline:
+            return None
+        frontier = self.frontier
+        constraints = list({c for v in variables for c in frontier.var_constraints[v]})
+        start = time.perf_counter()
+        # Graine tirée du générateur du solveur : parties reproductibles à graine égale
+        counts = sample_component(variables, constraints, frontier, self.samples, self.rng.getrandbits(63))
+        self._sample_cost = (self._sample_cost + (time.perf_counter() - start) / n) / 2
+        if counts is None: return None
+        if self.stats is not None:
+            self.stats.count("sampled_components")
+            self.stats.observe("sample_ess", counts.ess)
+        if self.verbose: print(f"   -> {len(variables)} vars estimées sur {counts.samples} tirages (taille effective {counts.ess:.0f}).")
+        return counts
 
-    def _is_consistent(self, assignment, constraints):
-        for (cx, cy) in constraints:
-            val = self.game.get_value(cx, cy)
-            neighbors = self.game.get_neighbors(cx, cy)
-            
-            mines_count = 0
-            unknowns_count = 0
-            
-            for n in neighbors:
-                if n in self.game.flags:
-                    mines_count += 1
-                elif n in assignment:
-                    mines_count += assignment[n]
-                elif n not in self.game.revealed:
-                    unknowns_count += 1
-            
-            # Si on a déjà plus de mines que le chiffre -> Impossible
-            if mines_count > val: return False
-            # Si même avec toutes les inconnues on n'atteint pas le chiffre -> Impossible
-            if mines_count + unknowns_count < val: return False
-            
-        return True
+    def _local_probability(self, var):
+        """Ancienne estimation locale : pire (mines restantes / cases cachées) autour de var"""
+        frontier = self.frontier
+        return max(frontier.remaining[c] / len(frontier.hidden[c]) for c in frontier.var_constraints[var])
 
     def _get_safest_guess(self):
-        prob_map = {}
-        # Calcul simple de probabilité locale
-        for (x, y) in self.game.revealed:
-            val = self.game.get_value(x, y)
-            neighbors = self.game.get_neighbors(x, y)
-            hidden = [n for n in neighbors if n not in self.game.revealed and n not in self.game.flags]
-            flagged = [n for n in neighbors if n in self.game.flags]
-            
-            if not hidden: continue
-            
-            # Formule : Mines restantes / Cases cachées
-            prob = (val - len(flagged)) / len(hidden)
-            
-            for cell in hidden:
-                # On garde la pire probabilité (le plus grand risque) pour une case donnée
-                prob_map[cell] = max(prob_map.get(cell, 0), prob)
+        frontier = self.frontier
+        view = self.view
+
+        # Cases cachées hors frontière ("intérieur") et mines restantes à placer
+        hidden_total = view.width * view.height - len(view.revealed) - len(view.flags)
+        interior = hidden_total - len(frontier.var_constraints)
+        mines_left = view.num_mines - len(view.flags)
+
+        # Les composantes interrompues sont énumérées en entier (dans la limite du budget)
+        exact = []
+        for counts in self._component_counts:
+            if not counts.complete and not counts.aborted and not self._budget_exhausted():
+                constraints = {c for v in counts.variables for c in frontier.var_constraints[v]}
+                counts = self._solve_component(counts.variables, list(constraints))
+                if counts is None: continue
+            if counts.complete:
+                exact.append(counts)
+            else:
+                self._skipped.append(counts.variables)
+        self._component_counts = exact
+
+        # Composantes trop grosses (ou hors budget) : comptes estimés par échantillonnage,
+        # combinés comme les autres. À défaut, estimation locale (pire cas, pour le choix
+        # du pari seulement) : ces cases comptent comme intérieures dans la pondération
+        # globale. Heuristique, mais sans retirer des mines restantes un nombre de mines
+        # tiré des ratios du pire cas, qui biaiserait interior_prob
+        estimated = []
+        local = {}
+        for variables in self._skipped:
+            counts = self._sample_component(variables)
+            if counts is not None:
+                estimated.append(counts)
+            else:
+                local.update((v, self._local_probability(v)) for v in variables)
+        interior += len(local)
+
+        # Solutions de chaque composante pondérées par C(intérieur, mines restantes)
+        # (exactes pour les composantes énumérées)
+        prob_map, interior_prob = mine_probabilities(exact + estimated, interior, mines_left)
+        if prob_map is None:
+            # Aucune combinaison compatible (ne devrait pas arriver) : heuristique locale partout
+            prob_map = {v: self._local_probability(v) for v in frontier.variables()}
+            interior_prob = None
+        prob_map.update(local)
+        self.interior_prob = interior_prob
 
         # On sauvegarde la map pour que le GUI puisse la dessiner !
-        self.game.prob_map = prob_map 
+        self.prob_map = prob_map
+
+        best_case = None
+        best_prob = None
+        if prob_map:
+            best_case = min(prob_map, key=prob_map.get)
+            best_prob = prob_map[best_case]
 
-        if not prob_map:
-            # Choix au hasard total (début de partie ou île isolée)
-            hidden_cells = [(x,y) for x in range(self.game.width) for y in range(self.game.height) 
-                           if (x,y) not in self.game.revealed and (x,y) not in self.game.flags]
+        if best_case is None or (interior_prob is not None and interior_prob < best_prob):
+            # Une case intérieure est moins risquée (ou aucune info : début de partie, île isolée)
+            w = view.width
+            cells = view.cells
+            hidden_cells = [(x,y) for x in range(w) for y in range(view.height)
+                           if cells[y * w + x] == HIDDEN and (x,y) not in frontier.var_constraints]
             if hidden_cells:
-                guess = random.choice(hidden_cells)
-                if self.verbose: print(f"🎲 Aucune info : Tentative au hasard sur {guess}")
+                guess = self.rng.choice(hidden_cells)
+                if self.verbose:
+                    if best_case is None: print(f"🎲 Aucune info : Tentative au hasard sur {guess}")
+                    else: print(f"🎲 Case intérieure {guess} avec {interior_prob*100:.1f}% de risque.")
                 return guess
-            return None
 
-        # Trier pour trouver le risque le plus faible
-        sorted_guesses = sorted(prob_map.items(), key=lambda item: item[1])
-        best_case = sorted_guesses[0][0]
-        best_prob = sorted_guesses[0][1]
+        if best_case is None: return None
         
         if self.verbose: print(f"📊 Meilleure option : {best_case} avec {best_prob*100:.1f}% de risque.")
-        return best_case
\ No newline at end of file
+        return best_case
@@ -0,0 +1,119 @@
+from game_engine import neighbor_table
+from observation import HIDDEN, FLAG
+
+
+class Frontier:
+    """Frontière active maintenue de façon incrémentale.
+
+    Une contrainte est une case chiffrée révélée qui a encore des voisins cachés.
+    Pour chacune on garde le nombre de mines restantes (chiffre - drapeaux voisins)
+    et l'ensemble de ses voisins cachés. La mise à jour ne lit que les cases
+    révélées ou marquées depuis le dernier appel à sync().
+    """
+    def __init__(self):
+        self.remaining = {}        # contrainte (x, y) -> mines restantes autour
+        self.hidden = {}           # contrainte (x, y) -> set des voisins cachés non marqués
+        self.var_constraints = {}  # case cachée -> set des contraintes qui la touchent
+        self.dirty = set()         # contraintes modifiées depuis la dernière logique simple
+        self._revealed_pos = 0
+        self._flags_pos = 0
+        self._view = None
+        self._table = None
+
+    def sync(self, view):
+        """Intègre les nouveaux drapeaux puis les nouvelles cases révélées d'une
+        observation (observation.Observation) plus récente de la même partie"""
+        self._view = view
+        w = view.width
+        self._table = neighbor_table(w, view.height)
+
+        # 1. Drapeaux d'abord : une contrainte créée ensuite les compte directement
+        flags = view.flags
+        for k in range(self._flags_pos, len(flags)):
+            i = flags[k]
+            self._on_flag((i % w, i // w))
+        self._flags_pos = len(flags)
+
+        # 2. Cases révélées depuis la dernière synchro (dans l'ordre du jeu)
+        revealed = view.revealed
+        for k in range(self._revealed_pos, len(revealed)):
+            self._on_reveal(revealed[k])
+        self._revealed_pos = len(revealed)
+
+    def variables(self):
+        """Toutes les cases cachées touchant au moins une contrainte"""
+        return self.var_constraints.keys()
+
+    def _touch(self, c):
+        if self.hidden[c]:
+            self.dirty.add(c)
+        else:
+            # Plus aucun voisin caché : la contrainte sort de la frontière
+            del self.hidden[c]
+            del self.remaining[c]
+            self.dirty.discard(c)
+
+    def _on_flag(self, cell):
+        for c in self.var_constraints.pop(cell, ()):
+            self.hidden[c].discard(cell)
+            self.remaining[c] -= 1
+            self._touch(c)
+
+    def _on_reveal(self, i):
+        view = self._view
+        w = view.width
+        cell = (i % w, i // w)
+        # La case n'est plus une inconnue pour les contraintes voisines
+        for c in self.var_constraints.pop(cell, ()):
+            self.hidden[c].discard(cell)
+            self._touch(c)
+
+        # Chiffre lu dans l'observation (pas d'accès aux mines de la partie)
+        cells = view.cells
+        val = cells[i]
+        if val >= HIDDEN: return # Mine révélée en fin de partie
+        # Un 0 n'a de voisins cachés que dans une observation partielle (server.py : le
+        # moteur les ouvre tous) ; il devient alors une contrainte à 0 mine comme les autres
+
+        table = self._table
+        hidden = set()
+        flagged = 0
+        for j, n in zip(table.neighbors(i), table.coords(i)):
+            state = cells[j]
+            if state == FLAG:
+                flagged += 1
+            elif state == HIDDEN:
+                hidden.add(n)
+
+        if not hidden: return
+        self.hidden[cell] = hidden
+        self.remaining[cell] = val - flagged
+        self.dirty.add(cell)
+        for n in hidden:
+            self.var_constraints.setdefault(n, set()).add(cell)
+
+    def components(self):
+        """Découpe la frontière en composantes indépendantes (aucune contrainte commune).
+        Retourne une liste de (variables, contraintes), variables dans l'ordre de parcours."""
+        components = []
+        seen = set()
+        for start in self.hidden:
+            if start in seen: continue
+            seen.add(start)
+            variables = []
+            constraints = []
+            queue = [start]
+            seen_vars = set()
+            # Parcours en largeur contrainte -> variables -> contraintes voisines
+            for c in queue:
+                constraints.append(c)
+                for v in self.hidden[c]:
+                    if v in seen_vars: continue
+                    seen_vars.add(v)
+                    variables.append(v)
+                    for other in self.var_constraints[v]:
+                        if other not in seen:
+                            seen.add(other)
+                            queue.append(other)
+            components.append((variables, constraints))
+        return components
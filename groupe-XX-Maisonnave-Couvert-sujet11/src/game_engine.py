@@ -1,17 +1,156 @@
 import random
+from array import array
+from collections import namedtuple
+from collections.abc import MutableSet
+from functools import lru_cache
+from observation import ObservationBuilder, HIDDEN
+
+# Résultat de Minesweeper.apply() : cases révélées et drapeaux posés par ce coup,
+# et la mine touchée (None si aucune)
+MoveDelta = namedtuple("MoveDelta", ["opened", "flagged", "boom"])
+
+
+class NeighborTable:
+    """Voisins précalculés d'une grille : la case d'indice i = y * width + x
+    a ses voisins dans index[8*i : 8*i + degree[i]]"""
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        n = width * height
+        self.index = array('i', [0]) * (8 * n)
+        self.degree = bytearray(n)
+        self._coords = [None] * n # Listes de tuples (x, y) construites à la demande
+
+        index = self.index
+        for y in range(height):
+            for x in range(width):
+                i = y * width + x
+                k = 8 * i
+                # Même ordre que l'ancien get_neighbors (dx puis dy)
+                for dx in (-1, 0, 1):
+                    nx = x + dx
+                    if nx < 0 or nx >= width: continue
+                    for dy in (-1, 0, 1):
+                        ny = y + dy
+                        if (dx or dy) and 0 <= ny < height:
+                            index[k] = ny * width + nx
+                            k += 1
+                self.degree[i] = k - 8 * i
+
+    def neighbors(self, i):
+        """Indices plats des voisins de la case i"""
+        start = 8 * i
+        return self.index[start:start + self.degree[i]]
+
+    def coords(self, i):
+        """Coordonnées (x, y) des voisins de la case i (tuple partagé, ne pas modifier)"""
+        cached = self._coords[i]
+        if cached is None:
+            w = self.width
+            cached = tuple((j % w, j // w) for j in self.neighbors(i))
+            self._coords[i] = cached
+        return cached
+
+
+@lru_cache(maxsize=8)
+def neighbor_table(width, height):
+    """Une seule table de voisins par taille de grille (partagée entre les parties)"""
+    return NeighborTable(width, height)
+
+
+class CellSet(MutableSet):
+    """Ensemble de cases (x, y) stocké dans un tableau d'octets plat (mode compact).
+    S'utilise comme un set : `in`, add, update, len, itération..."""
+    def __init__(self, width, height, cells=()):
+        self.width = width
+        self.height = height
+        self.bits = bytearray(width * height)
+        self._len = 0
+        self.update(cells)
+
+    @classmethod
+    def _from_iterable(cls, it):
+        # Les opérations ensemblistes (-, &, |) renvoient un set classique
+        return set(it)
+
+    def __contains__(self, cell):
+        x, y = cell
+        return 0 <= x < self.width and 0 <= y < self.height and self.bits[y * self.width + x] == 1
+
+    def __iter__(self):
+        w = self.width
+        find = self.bits.find
+        i = find(1)
+        while i != -1:
+            yield (i % w, i // w)
+            i = find(1, i + 1)
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return f"CellSet({set(self)!r})"
+
+    def add(self, cell):
+        x, y = cell
+        i = y * self.width + x
+        if not self.bits[i]:
+            self.bits[i] = 1
+            self._len += 1
+
+    def discard(self, cell):
+        if cell in self:
+            x, y = cell
+            self.bits[y * self.width + x] = 0
+            self._len -= 1
+
+    def update(self, *iterables):
+        for it in iterables:
+            for cell in it:
+                self.add(cell)
+
+    def clear(self):
+        self.bits = bytearray(self.width * self.height)
+        self._len = 0
+
 
 class Minesweeper:
-    def __init__(self, width=10, height=10, num_mines=10):
+    def __init__(self, width=10, height=10, num_mines=10, compact=False, rng=None, stats=None):
         self.width = width
         self.height = height
         self.num_mines = num_mines
-        self.grid = set()  # Set of (x,y) positions of mines
-        self.revealed = set() # Set of revealed cells
-        self.flags = set() # Set of flagged cells
-        self.first_click = True 
-        
+        self.compact = compact
+        # Générateur aléatoire (random.Random(seed) pour une partie reproductible)
+        self.rng = rng if rng is not None else random
+        # Instrumentation (instrumentation.Stats), désactivée par défaut
+        self.stats = stats
+        if compact:
+            # Mode compact : tableaux d'octets plats au lieu de sets de tuples (grandes grilles)
+            self.grid = CellSet(width, height)
+            self.revealed = CellSet(width, height)
+            self.flags = CellSet(width, height)
+        else:
+            self.grid = set()  # Set of (x,y) positions of mines
+            self.revealed = set() # Set of revealed cells
+            self.flags = set() # Set of flagged cells
+        self.first_click = True
+
         # NOUVEAU : On stocke la position de la mine qui a fait perdre le joueur
-        self.killer_move = None 
+        self.killer_move = None
+
+        # Journal des cases révélées (dans l'ordre) : le solveur le lit pour se mettre à jour
+        self.reveal_log = []
+
+        # Voisins précalculés (une table par taille) et nombres calculés à la pose des mines
+        self.neighbor_table = neighbor_table(width, height)
+        self.counts = None
+
+        # Cases sûres encore cachées (tenu à jour par reveal_cells) : victoire quand il vaut 0
+        self.safe_left = width * height - num_mines
+
+        # Vue joueur tenue à jour par observe() (position atteinte dans reveal_log)
+        self._observer = None
+        self._observed = 0
 
     def _place_mines(self, safe_x, safe_y):
         """Place les mines aléatoirement MAIS évite la première case cliquée"""
@@ -22,52 +161,157 @@ class Minesweeper:
                 if abs(x - safe_x) <= 1 and abs(y - safe_y) <= 1:
                     continue
                 candidates.append((x, y))
-        
+
         # On choisit les mines parmi les candidats sûrs
-        self.grid = set(random.sample(candidates, min(self.num_mines, len(candidates))))
+        self.set_mines(self.rng.sample(candidates, min(self.num_mines, len(candidates))))
+
+    def set_mines(self, mines):
+        """Fixe la position des mines et précalcule le nombre de chaque case"""
+        if self.compact:
+            self.grid = CellSet(self.width, self.height, mines)
+        else:
+            self.grid = set(mines)
+        self.first_click = False
+
+        w = self.width
+        counts = array('b', bytes(w * self.height))
+        neighbors = self.neighbor_table.neighbors
+        for (x, y) in self.grid:
+            for j in neighbors(y * w + x):
+                counts[j] += 1
+        for (x, y) in self.grid:
+            counts[y * w + x] = -1
+        self.counts = counts
+        self.safe_left = w * self.height - len(self.grid) - sum(1 for c in self.revealed if c not in self.grid)
 
     def reveal(self, x, y):
         """Révèle une case. Retourne True si c'est une mine (Perdu), False sinon."""
+        boom, _ = self.reveal_cells(x, y)
+        return boom
+
+    def reveal_cells(self, x, y):
+        """Révèle une case et retourne (boom, cases_nouvellement_révélées)"""
         if (x, y) in self.flags or (x, y) in self.revealed:
-            return False
-        
+            return False, set()
+
         # Génération des mines au premier clic
         if self.first_click:
             self._place_mines(x, y)
             self.first_click = False
 
-        self.revealed.add((x, y))
-
         # --- GESTION DE LA DÉFAITE ---
         if (x, y) in self.grid:
             self.killer_move = (x, y)       # On mémorise la coupable
-            self.revealed.update(self.grid) # On révèle tout le reste pour voir la solution
-            return True # BOOM
+            opened = {(x, y)}
+            opened.update(m for m in self.grid if m not in self.revealed)
+            self.revealed.update(opened) # On révèle tout le reste pour voir la solution
+            self.reveal_log.extend(opened)
+            return True, opened # BOOM
+
+        self.revealed.add((x, y))
+        opened = {(x, y)}
+
+        # Si la case est vide (0 mine autour), on révèle la zone (Flood Fill itératif,
+        # une pile au lieu de la récursion pour ne pas dépasser la limite de Python)
+        w = self.width
+        counts = self.counts
+        if counts[y * w + x] == 0:
+            revealed = self.revealed
+            flags = self.flags
+            neighbors = self.neighbor_table.neighbors
+            # Marque par indice des cases déjà traitées : chaque case n'est testée qu'une fois
+            seen = bytearray(len(counts))
+            seen[y * w + x] = 1
+            stack = [y * w + x]
+            while stack:
+                for j in neighbors(stack.pop()):
+                    if seen[j]:
+                        continue
+                    seen[j] = 1
+                    cell = (j % w, j // w)
+                    if cell in revealed or cell in flags:
+                        continue
+                    revealed.add(cell)
+                    opened.add(cell)
+                    # Une case voisine d'un 0 n'est jamais une mine
+                    if counts[j] == 0:
+                        stack.append(j)
+
+        self.reveal_log.extend(opened)
+        self.safe_left -= len(opened)
+        if self.stats is not None:
+            self.stats.count("reveal_calls")
+            self.stats.count("cells_opened", len(opened))
+        return False, opened
 
-        # Si la case est vide (0 mine autour), on révèle les voisins (Flood Fill)
-        if self.get_value(x, y) == 0:
-            for nx, ny in self.get_neighbors(x, y):
-                if (nx, ny) not in self.revealed:
-                    self.reveal(nx, ny)
-        
-        return False
+    def apply(self, safe, mines):
+        """Applique un coup complet : drapeaux sur `mines`, puis révélation des
+        cases `safe` (arrêt à la première mine). Les cases déjà révélées ou
+        marquées sont ignorées. Retourne un MoveDelta (cases révélées, drapeaux
+        posés, mine touchée ou None)"""
+        flags = self.flags
+        revealed = self.revealed
+        flagged = []
+        for cell in mines:
+            if cell not in flags and cell not in revealed:
+                flags.add(cell)
+                flagged.append(cell)
+
+        # Les cases ouvertes se lisent dans le journal : une seule liste, sans copie par révélation
+        start = len(self.reveal_log)
+        boom = None
+        for (x, y) in safe:
+            if (x, y) in revealed or (x, y) in flags: continue
+            hit, _ = self.reveal_cells(x, y)
+            if hit:
+                boom = (x, y)
+                break
+        return MoveDelta(self.reveal_log[start:], flagged, boom)
+
+    def won(self):
+        """Toutes les cases sûres sont révélées (O(1))"""
+        return self.safe_left == 0 and self.killer_move is None
+
+    def lost(self):
+        return self.killer_move is not None
+
+    def observe(self):
+        """Ce que voit le joueur (observation.Observation, immuable, sans les mines).
+        Seules les cases révélées ou marquées depuis l'appel précédent sont lues"""
+        observer = self._observer
+        if observer is None:
+            observer = self._observer = ObservationBuilder(self.width, self.height, self.num_mines)
+        w = self.width
+        log = self.reveal_log
+        if self.counts is not None:
+            counts = self.counts
+            opened = [y * w + x for (x, y) in log[self._observed:]]
+            observer.reveal_many([(i, counts[i]) for i in opened])
+        else:
+            observer.reveal_many([(y * w + x, self.get_value(x, y)) for (x, y) in log[self._observed:]])
+        self._observed = len(log)
+        if len(self.flags) != len(observer.flags):
+            cells = observer.cells
+            for (x, y) in self.flags:
+                if cells[y * w + x] == HIDDEN: observer.flag(y * w + x)
+        return observer.snapshot()
 
     def get_neighbors(self, x, y):
-        neighbors = []
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0: continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.width and 0 <= ny < self.height:
-                    neighbors.append((nx, ny))
-        return neighbors
+        """Liste des voisins de (x, y) (nouvelle liste : l'appelant peut la modifier)"""
+        return list(self.neighbor_table.coords(y * self.width + x))
 
     def get_value(self, x, y):
         """Retourne le nombre de mines autour de (x, y)"""
+        # Chiffres précalculés par set_mines() (appelé au premier clic) : une grille
+        # modifiée ensuite à la main doit repasser par set_mines(), sinon ils sont faux
+        if self.counts is not None:
+            return self.counts[y * self.width + x]
+
+        # Mines pas encore posées : comptage direct
         if (x,y) in self.grid:
             return -1
         count = 0
-        for nx, ny in self.get_neighbors(x, y):
+        for nx, ny in self.neighbor_table.coords(y * self.width + x):
             if (nx, ny) in self.grid:
                 count += 1
-        return count
\ No newline at end of file
+        return count
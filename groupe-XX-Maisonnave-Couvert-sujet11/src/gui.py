@@ -2,7 +2,7 @@ import pygame
 import time
 
 class GameGUI:
-    def __init__(self, game, cell_size=40):
+    def __init__(self, game, cell_size=40, incremental=True):
         self.game = game
         self.cell_size = cell_size
         self.width = game.width * cell_size
@@ -25,16 +25,38 @@ class GameGUI:
             }
         }
         
-        self.font = pygame.font.SysFont('Arial', 24, bold=True)
+        self.font = pygame.font.SysFont('Arial', max(8, cell_size * 3 // 5), bold=True)
         # Police pour le message de fin
         self.overlay_font = pygame.font.SysFont('Arial', 36, bold=True)
+        # Police des pourcentages (créée une fois, pas à chaque case)
+        self.small_font = pygame.font.SysFont('Arial', max(6, cell_size // 4))
+
+        # Surfaces précalculées : chiffres 1 à 8, calques de probabilité et
+        # étiquettes "xx%" (créés à la première utilisation), message de fin
+        self._glyphs = {val: self.font.render(str(val), True, color) for val, color in self.COLORS['text'].items()}
+        self._tiles = {}
+        self._labels = {}
+        self._messages = {}
+
+        # Mode incrémental : draw() ne redessine que les cases qui ont changé et
+        # retourne leurs rectangles (pour pygame.display.update(rects))
+        self.incremental = incremental
+        self._drawn = {}       # case -> état dessiné
+        self._log_pos = 0      # Position dans game.reveal_log
+        self._flags_seen = set()
+        self._prob_map = None  # Dernière prob_map dessinée
+        self._killer = None
+        self._overlay = None   # (statut, visible) du message de fin au dernier dessin
+        self._full = True      # Prochain dessin complet
 
     def handle_click(self, pos):
-        """Convertit le clic souris en coordonnées de grille"""
+        """Convertit le clic souris en coordonnées de grille (retourne la case, ou None)"""
         x = pos[0] // self.cell_size
         y = pos[1] // self.cell_size
         if 0 <= x < self.game.width and 0 <= y < self.game.height:
             self.game.reveal(x, y)
+            return (x, y)
+        return None
 
     def draw_cute_bomb(self, surface, x, y, cell_size):
         """Dessine une bombe style cartoon au centre de la case (x,y)"""
@@ -60,7 +82,6 @@ class GameGUI:
     def draw_cell(self, x, y):
         """Dessine une case unique"""
         rect = pygame.Rect(x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size)
-        val = self.game.get_value(x, y)
         
         # Récupération sécurisée du coup fatal (s'il existe)
         killer = getattr(self.game, 'killer_move', None)
@@ -81,10 +102,12 @@ class GameGUI:
                 center = rect.center
                 pygame.draw.circle(self.screen, (100, 100, 100), center, self.cell_size // 5)
             
-            elif val > 0:
-                # C'est un chiffre
-                text = self.font.render(str(val), True, self.COLORS['text'].get(val, (0,0,0)))
-                self.screen.blit(text, text.get_rect(center=rect.center))
+            else:
+                val = self.game.get_value(x, y)
+                if val > 0:
+                    # C'est un chiffre (rendu une fois pour toutes)
+                    text = self._glyphs[val]
+                    self.screen.blit(text, text.get_rect(center=rect.center))
         
         # --- CAS 3 : La case est CACHÉE ---
         else:
@@ -98,47 +121,65 @@ class GameGUI:
     def draw_probabilities(self, prob_map):
         """Affiche un calque de couleur selon la probabilité"""
         for (x, y), prob in prob_map.items():
-            rect = pygame.Rect(x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size)
-            
-            # Plus la proba est haute, plus c'est rouge/jaune
-            intensity = int(255 * prob) 
-            s = pygame.Surface((self.cell_size, self.cell_size))
-            s.set_alpha(100) # Transparence
-            s.fill((intensity, 255 - intensity, 0))
-            self.screen.blit(s, rect.topleft)
-            
-            # Affichage du pourcentage si > 0
-            if prob > 0.0:
-                perc_text = pygame.font.SysFont('Arial', 10).render(f"{int(prob*100)}%", True, (0,0,0))
-                self.screen.blit(perc_text, rect.topleft)
+            self.draw_probability(x, y, prob)
+
+    def draw_probability(self, x, y, prob):
+        """Calque de couleur d'une case (surfaces mises en cache par intensité / pourcentage)"""
+        topleft = (x * self.cell_size, y * self.cell_size)
+
+        # Plus la proba est haute, plus c'est rouge/jaune
+        intensity = int(255 * prob)
+        tile = self._tiles.get(intensity)
+        if tile is None:
+            tile = pygame.Surface((self.cell_size, self.cell_size))
+            tile.set_alpha(100) # Transparence
+            tile.fill((intensity, 255 - intensity, 0))
+            self._tiles[intensity] = tile
+        self.screen.blit(tile, topleft)
+
+        # Affichage du pourcentage si > 0
+        if prob > 0.0:
+            percent = int(prob * 100)
+            label = self._labels.get(percent)
+            if label is None:
+                label = self._labels[percent] = self.small_font.render(f"{percent}%", True, (0,0,0))
+            self.screen.blit(label, topleft)
+
+    def _overlay_visible(self):
+        # Clignotement toutes les 800ms
+        return (pygame.time.get_ticks() // 800) % 2 == 1
+
+    def _restart_message(self, status):
+        """(fond, texte, rectangle du fond) du message de fin, rendus une fois par statut"""
+        message = self._messages.get(status)
+        if message is None:
+            text_str = f"{status} - Appuyez sur R"
+            color = (0, 150, 0) if "VICTOIRE" in status else (200, 0, 0)
+
+            text_surf = self.overlay_font.render(text_str, True, color)
+
+            # Fond semi-transparent
+            bg_surf = pygame.Surface((text_surf.get_width() + 20, text_surf.get_height() + 20))
+            bg_surf.set_alpha(200)
+            bg_surf.fill((255, 255, 255))
+            bg_rect = bg_surf.get_rect(center=(self.width // 2, self.height // 2))
+            message = self._messages[status] = (bg_surf, text_surf, bg_rect)
+        return message
 
     def draw_restart_overlay(self, status):
         """Affiche un message clignotant semi-transparent"""
-        current_time = pygame.time.get_ticks()
-        
-        # Clignotement toutes les 800ms
-        if (current_time // 800) % 2 == 0:
+        if not self._overlay_visible():
             return 
 
-        text_str = f"{status} - Appuyez sur R"
-        color = (0, 150, 0) if "VICTOIRE" in status else (200, 0, 0)
-        
-        text_surf = self.overlay_font.render(text_str, True, color)
-        
-        # Fond semi-transparent
-        bg_surf = pygame.Surface((text_surf.get_width() + 20, text_surf.get_height() + 20))
-        bg_surf.set_alpha(200)
-        bg_surf.fill((255, 255, 255))
-        
-        center_x, center_y = self.width // 2, self.height // 2
-        bg_rect = bg_surf.get_rect(center=(center_x, center_y))
-        text_rect = text_surf.get_rect(center=(center_x, center_y))
-        
+        bg_surf, text_surf, bg_rect = self._restart_message(status)
         self.screen.blit(bg_surf, bg_rect)
-        self.screen.blit(text_surf, text_rect)
+        self.screen.blit(text_surf, text_surf.get_rect(center=bg_rect.center))
 
     def draw(self, game_status=None):
-        """Boucle de dessin principal mise à jour"""
+        """Boucle de dessin principal mise à jour.
+        En mode incrémental, retourne la liste des rectangles modifiés"""
+        if self.incremental:
+            return self._draw_changes(game_status)
         self.screen.fill((0, 0, 0))
         for x in range(self.game.width):
             for y in range(self.game.height):
@@ -150,4 +191,92 @@ class GameGUI:
             
         # Affichage du message de fin
         if game_status:
-            self.draw_restart_overlay(game_status)
\ No newline at end of file
+            self.draw_restart_overlay(game_status)
+
+    def invalidate(self):
+        """Force un dessin complet au prochain draw() (grille modifiée à la main...)"""
+        self._full = True
+
+    def _cell_state(self, cell, prob_map):
+        """Ce qui est affiché sur une case : deux cases de même état ont le même dessin"""
+        game = self.game
+        if cell == self._killer:
+            base = 'killer'
+        elif cell in game.revealed:
+            base = 'mine' if cell in game.grid else game.get_value(*cell)
+        else:
+            base = 'flag' if cell in game.flags else None
+        prob = prob_map.get(cell) if prob_map else None
+        return base, (None if prob is None else (int(255 * prob), int(prob * 100)))
+
+    def _draw_changes(self, game_status):
+        """Redessine les cases dont l'état a changé depuis le dernier appel"""
+        game = self.game
+        prob_map = getattr(game, 'prob_map', None)
+        killer = getattr(game, 'killer_move', None)
+
+        # 1. Cases candidates : nouvelles révélations, drapeaux, probabilités, case fatale
+        if self._full:
+            candidates = [(x, y) for x in range(game.width) for y in range(game.height)]
+            self._drawn.clear()
+        else:
+            log = game.reveal_log
+            candidates = log[self._log_pos:]
+            flags = set(game.flags)
+            if len(flags) != len(self._flags_seen) or flags != self._flags_seen:
+                candidates = candidates + list(flags ^ self._flags_seen)
+            if prob_map is not self._prob_map:
+                candidates = candidates + list(self._prob_map or ()) + list(prob_map or ())
+            if killer != self._killer:
+                candidates = candidates + [c for c in (killer, self._killer) if c is not None]
+        self._log_pos = len(game.reveal_log)
+        self._flags_seen = set(game.flags)
+        self._prob_map = prob_map
+        self._killer = killer
+
+        # 2. Dessin des cases dont l'état affiché a changé
+        rects = []
+        size = self.cell_size
+        drawn = self._drawn
+        for cell in candidates:
+            state = self._cell_state(cell, prob_map)
+            if drawn.get(cell) == state: continue
+            drawn[cell] = state
+            x, y = cell
+            self.draw_cell(x, y)
+            if state[1] is not None:
+                self.draw_probability(x, y, prob_map[cell])
+            rects.append(pygame.Rect(x * size, y * size, size, size))
+
+        # 3. Message de fin : redessiné quand il clignote ou qu'une case dessous a changé
+        overlay = (game_status, game_status is not None and self._overlay_visible())
+        if self._overlay is not None and self._overlay[0] is not None and overlay != self._overlay:
+            # Il disparaît (ou change) : on redessine les cases qu'il recouvrait
+            area = self._restart_message(self._overlay[0])[2]
+            for cell in self._cells_under(area):
+                x, y = cell
+                drawn[cell] = self._cell_state(cell, prob_map)
+                self.draw_cell(x, y)
+                if drawn[cell][1] is not None:
+                    self.draw_probability(x, y, prob_map[cell])
+            rects.append(area)
+        if overlay[1]:
+            area = self._restart_message(game_status)[2]
+            if overlay != self._overlay or area.collidelist(rects) != -1:
+                self.draw_restart_overlay(game_status)
+                rects.append(area)
+        self._overlay = overlay
+
+        if self._full:
+            self._full = False
+            return [self.screen.get_rect()]
+        # Beaucoup de petites zones (flood fill) : un seul rectangle englobant
+        if len(rects) > 256:
+            rects = [rects[0].unionall(rects[1:])]
+        return rects
+
+    def _cells_under(self, area):
+        size = self.cell_size
+        xs = range(max(0, area.left // size), min(self.game.width, (area.right - 1) // size + 1))
+        ys = range(max(0, area.top // size), min(self.game.height, (area.bottom - 1) // size + 1))
+        return [(x, y) for x in xs for y in ys]
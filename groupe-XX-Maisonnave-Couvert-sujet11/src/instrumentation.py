@@ -0,0 +1,94 @@
+import threading
+
+
+class Stats:
+    """Compteurs, mesures et chronomètres du solveur et du moteur.
+
+    Désactivé par défaut : CSPSolver et Minesweeper gardent `stats = None` et ne
+    testent que ça dans leurs boucles. Une fois branché (stats=Stats()), on lit
+    les valeurs avec snapshot() ou report(), ou on s'abonne aux événements avec
+    subscribe(callback) : callback(événement, données) est appelé à l'entrée et
+    à la sortie de chaque phase de solve() ("phase_enter", "phase_exit").
+    Un même Stats peut être partagé entre threads (moteur dans la boucle
+    d'événements, solveur dans solver_worker) : chaque écriture ou lecture
+    passe par un verrou.
+    """
+    def __init__(self):
+        self.counters = {}      # nom -> total
+        self.observations = {}  # nom -> [nombre, somme, max]
+        self.timers = {}        # nom -> [nombre, secondes cumulées]
+        self._callbacks = []
+        self._lock = threading.RLock() # Réentrant : merge() appelle count()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        """Valeur mesurée ponctuellement (taille de frontière, nombre de composantes...)"""
+        with self._lock:
+            obs = self.observations.get(name)
+            if obs is None:
+                self.observations[name] = [1, value, value]
+            else:
+                obs[0] += 1
+                obs[1] += value
+                if value > obs[2]: obs[2] = value
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def emit(self, event, **data):
+        for callback in self._callbacks:
+            callback(event, data)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.observations.clear()
+            self.timers.clear()
+
+    def merge(self, other):
+        """Ajoute les valeurs d'un autre Stats (ou d'un snapshot) à celui-ci"""
+        data = other.snapshot() if isinstance(other, Stats) else other
+        with self._lock:
+            for name, n in data['counters'].items():
+                self.count(name, n)
+            for name, obs in data['observations'].items():
+                mine = self.observations.setdefault(name, [0, 0, obs['max']])
+                mine[0] += obs['n']
+                mine[1] += obs['sum']
+                mine[2] = max(mine[2], obs['max'])
+            for name, timer in data['timers'].items():
+                mine = self.timers.setdefault(name, [0, 0.0])
+                mine[0] += timer['n']
+                mine[1] += timer['seconds']
+
+    def snapshot(self):
+        """Copie des valeurs sous forme de dicts simples (sérialisable en JSON / pickle)"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'observations': {name: {'n': n, 'sum': total, 'max': peak}
+                                 for name, (n, total, peak) in self.observations.items()},
+                'timers': {name: {'n': n, 'seconds': seconds} for name, (n, seconds) in self.timers.items()},
+            }
+
+    def report(self):
+        """Résumé lisible, une ligne par valeur"""
+        data = self.snapshot()
+        lines = [f"{name:<24} {n}" for name, n in sorted(data['counters'].items())]
+        for name, obs in sorted(data['observations'].items()):
+            lines.append(f"{name:<24} moy {obs['sum'] / obs['n']:.1f}  max {obs['max']}")
+        for name, timer in sorted(data['timers'].items()):
+            lines.append(f"{name:<24} {timer['seconds']*1000:.1f} ms ({timer['n']} appels)")
+        return "\n".join(lines)
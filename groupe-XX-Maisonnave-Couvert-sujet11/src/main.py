@@ -1,35 +1,104 @@
+import os
 import pygame
-import sys
+import random
 import argparse  # <--- NOUVEAU : Pour gérer les arguments
 from game_engine import Minesweeper
 from gui import GameGUI
-from csp_solver import CSPSolver
+from solver_worker import SolverWorker
+from instrumentation import Stats
+from replay import ReplayRecorder, load, new_game, apply_move
 
-def main():
+# Nœuds de recherche par coup avec --seed / --record (~100 ms sur une machine récente)
+REPRODUCIBLE_NODE_BUDGET = 50000
+
+def main(argv=None):
+    """Lance le jeu ; `argv` comme sur la ligne de commande (défaut : sys.argv), pour le launcher"""
     # --- 1. GESTION DES ARGUMENTS ---
     parser = argparse.ArgumentParser(description="Démineur IA")
     parser.add_argument("--width", type=int, default=15, help="Largeur de la grille")
     parser.add_argument("--height", type=int, default=15, help="Hauteur de la grille")
     parser.add_argument("--mines", type=int, default=30, help="Nombre de mines")
-    args = parser.parse_args()
+    parser.add_argument("--compact", action="store_true", help="Plateau compact (tableaux plats) pour les grandes grilles")
+    parser.add_argument("--budget-ms", type=float, default=100, help="Temps de réflexion max de l'IA par coup (ms, 0 = illimité)")
+    parser.add_argument("--node-budget", type=int, default=None,
+                        help=f"Budget de nœuds de recherche de l'IA par coup, à la place de --budget-ms "
+                             f"({REPRODUCIBLE_NODE_BUDGET} par défaut avec --seed ou --record)")
+    parser.add_argument("--cell-size", type=int, default=None, help="Taille d'une case en pixels (défaut : adaptée à la grille)")
+    parser.add_argument("--full-redraw", action="store_true", help="Redessine toute la grille à chaque image (ancien rendu)")
+    parser.add_argument("--stats", action="store_true", help="Instrumentation du solveur (titre de la fenêtre + résumé en fin de partie)")
+    parser.add_argument("--seed", type=int, default=None, help="Graine des mines et des choix de l'IA (partie suivante : +1). "
+                             "Budget en nœuds au lieu du temps : mêmes coups d'une machine à l'autre")
+    parser.add_argument("--record", metavar="FICHIER", help="Écrit le journal de chaque partie terminée (rejouable), "
+                             "un fichier par partie : FICHIER.jsonl -> FICHIER_1.jsonl, FICHIER_2.jsonl...")
+    parser.add_argument("--replay", metavar="FICHIER", help="Rejoue un journal coup par coup au lieu de faire jouer l'IA")
+    args = parser.parse_args(argv)
+    # Un budget de temps dépend de la charge de la machine : la même graine pourrait donner
+    # une autre partie. Pour une partie reproductible, budget en nœuds de recherche
+    node_budget = args.node_budget
+    if node_budget is None and args.budget_ms > 0 and (args.seed is not None or args.record):
+        node_budget = REPRODUCIBLE_NODE_BUDGET
+    time_budget = args.budget_ms / 1000 if args.budget_ms > 0 and node_budget is None else None
+    replay_log = load(args.replay) if args.replay else None
+    if replay_log is not None:
+        header = replay_log[0]
+        args.width, args.height, args.mines = header['width'], header['height'], header['mines']
 
     # --- 2. INITIALISATION PYGAME ---
     pygame.init()
     AI_EVENT = pygame.USEREVENT + 1
     pygame.time.set_timer(AI_EVENT, 150) # Vitesse de l'IA
+    clock = pygame.time.Clock()
+    # Cases de 40 px, réduites pour que les grandes grilles tiennent à l'écran
+    cell_size = args.cell_size or max(4, min(40, 1000 // max(args.width, args.height)))
 
     def reset_game():
         """Fonction pour (re)démarrer une partie avec les paramètres choisis"""
         print(f"\n--- NOUVELLE PARTIE ({args.width}x{args.height} - {args.mines} mines) ---")
         
         # On utilise les arguments args.width, args.height, etc.
-        g = Minesweeper(width=args.width, height=args.height, num_mines=args.mines)
-        gui = GameGUI(g)
-        s = CSPSolver(g)
-        return g, gui, s
+        stats = Stats() if args.stats else None
+        if replay_log is not None:
+            # Rejeu : mines du journal, pas d'IA (les coups sont lus au rythme de l'IA)
+            replay_pos[0] = 0
+            g = new_game(replay_log[0], args.compact)
+            return g, GameGUI(g, cell_size, incremental=not args.full_redraw), None, None
+
+        seed = None
+        rng = None
+        if args.seed is not None:
+            seed = args.seed + games_played[0]
+            rng = random.Random(seed)
+        games_played[0] += 1
+        g = Minesweeper(width=args.width, height=args.height, num_mines=args.mines, compact=args.compact, rng=rng, stats=stats)
+        gui = GameGUI(g, cell_size, incremental=not args.full_redraw)
+        # L'IA tourne dans un thread : la fenêtre reste réactive pendant les longues recherches
+        w = SolverWorker(g, stats=stats, rng=rng, time_budget=time_budget, node_budget=node_budget)
+        rec = ReplayRecorder(g, seed) if args.record else None
+        if stats is not None:
+            # Affiche dans le titre la dernière phase du solveur et sa durée
+            # (appelé dans le thread de l'IA : le titre est changé par la boucle principale)
+            def show_phase(event, data):
+                if event == "phase_exit":
+                    caption[0] = (f"Démineur IA - {data['phase']} {data['seconds']*1000:.1f} ms"
+                                  f" - {stats.counters.get('search_nodes', 0)} nœuds")
+            stats.subscribe(show_phase)
+        return g, gui, w, rec
 
+    def end_game():
+        """Fin de partie : résumé de l'instrumentation et journal"""
+        if worker is not None and worker.solver.stats is not None: print(worker.solver.stats.report())
+        if recorder is not None:
+            # Numéro de la partie dans le nom : la suivante n'écrase pas ce journal
+            root, ext = os.path.splitext(args.record)
+            path = f"{root}_{games_played[0]}{ext}"
+            recorder.save(path)
+            print(f"💾 Journal de la partie écrit dans {path}")
+
+    caption = [None] # Titre de fenêtre en attente
+    games_played = [0]
+    replay_pos = [0] # Prochain coup du journal rejoué
     # Initialisation première partie
-    game, gui, solver = reset_game()
+    game, gui, worker, recorder = reset_game()
     
     running = True
     game_over = False
@@ -37,10 +106,17 @@ def main():
 
     while running:
         # Vérification Victoire
-        if not game_over and len(game.revealed) + len(game.grid) == game.width * game.height:
+        if not game_over and game.won():
             print("🏆 VICTOIRE ! Tous les pièges ont été évités.")
             game_over = True
             game_status = "VICTOIRE"
+            end_game()
+        elif not game_over and game.lost():
+            # Mine touchée par un clic manuel
+            print(f"💀 GAME OVER ! Mine en {game.killer_move}")
+            game_over = True
+            game_status = "DÉFAITE"
+            end_game()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -49,37 +125,65 @@ def main():
             # --- GESTION DU RESTART (Touche R) ---
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
-                    game, gui, solver = reset_game()
+                    if worker is not None: worker.stop() # Le calcul de l'ancienne partie est abandonné
+                    game, gui, worker, recorder = reset_game()
                     game_over = False
                     game_status = None
             
             # --- GESTION DU CLIC MANUEL ---
             elif event.type == pygame.MOUSEBUTTONDOWN and not game_over:
-                 gui.handle_click(pygame.mouse.get_pos())
+                 # Le plateau change : le coup en cours de calcul est périmé
+                 if worker is not None: worker.cancel()
+                 cell = gui.handle_click(pygame.mouse.get_pos())
+                 if cell is not None and recorder is not None: recorder.reveal(*cell, "manual")
             
+            # --- REJEU D'UN JOURNAL ---
+            elif event.type == AI_EVENT and not game_over and replay_log is not None:
+                moves = replay_log[1]
+                if replay_pos[0] < len(moves):
+                    move = moves[replay_pos[0]]
+                    replay_pos[0] += 1
+                    caption[0] = f"Rejeu - coup {replay_pos[0]}/{len(moves)} ({move[3]})"
+                    if apply_move(game, move):
+                        print(f"💀 GAME OVER ! Coup fatal en {game.killer_move} (phase {move[3]})")
+                        game_over = True
+                        game_status = "DÉFAITE"
+
             # --- GESTION IA ---
-            elif event.type == AI_EVENT and not game_over:
-                safe, mines = solver.solve()
-                
-                # Appliquer les drapeaux
-                for m in mines: game.flags.add(m)
-                
-                # Appliquer les révélations
-                for s in safe:
-                    if (s[0], s[1]) not in game.revealed:
-                        if game.reveal(s[0], s[1]):
-                            print(f"💀 GAME OVER ! L'IA a explosé en {s}")
-                            game_over = True
-                            game_status = "DÉFAITE"
-                            # On révèle tout pour montrer les dégâts
-                            game.revealed.update(game.grid)
+            # Une demande à la fois : le thread reçoit l'état actuel du plateau
+            elif event.type == AI_EVENT and not game_over and not worker.busy():
+                worker.submit()
+
+        # Coups calculés par l'IA (jamais bloquant)
+        for safe, mines, phase, prob_map in (worker.poll() if worker is not None else ()):
+            if game_over: break
+            if prob_map is not None: game.prob_map = prob_map
+            
+            # Appliquer drapeaux et révélations d'un bloc
+            delta = game.apply(safe, mines)
+            if recorder is not None: recorder.record(safe, delta, phase)
+            if delta.boom is not None:
+                # (le moteur a déjà révélé toutes les mines pour montrer les dégâts)
+                print(f"💀 GAME OVER ! L'IA a explosé en {delta.boom}")
+                game_over = True
+                game_status = "DÉFAITE"
+                end_game()
+
+        if caption[0] is not None:
+            pygame.display.set_caption(caption[0])
+            caption[0] = None
 
         # Dessin (avec le statut pour le message de fin)
-        gui.draw(game_status)
-        pygame.display.flip()
+        # Mode incrémental : seules les zones modifiées sont envoyées à l'écran
+        rects = gui.draw(game_status)
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        clock.tick(60)
 
+    if worker is not None: worker.stop()
     pygame.quit()
-    sys.exit()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import struct
+from array import array
+
+# Contenu d'une case dans Observation.cells (0 à 8 : chiffre d'une case révélée)
+HIDDEN = 9
+FLAG = 10
+MINE = 11 # Mine révélée (fin de partie perdue)
+
+# En-tête de pack() : largeur, hauteur, mines, nb de cases révélées, nb de drapeaux
+_HEADER = struct.Struct("<5I")
+
+
+class Observation:
+    """Ce que le joueur voit du plateau à un instant donné, figé.
+
+    cells : un octet par case (indice y * width + x), chiffre ou HIDDEN / FLAG / MINE.
+    revealed et flags : indices des cases révélées / marquées, dans l'ordre où
+    elles l'ont été (une observation plus récente de la même partie les prolonge :
+    le solveur n'en lit que la fin). Aucune référence aux mines de la partie.
+    Uniquement des octets : se copie, se picke ou passe en mémoire partagée
+    (pack / unpack) sans conversion.
+    """
+    __slots__ = ("width", "height", "num_mines", "cells", "revealed", "flags")
+
+    def __init__(self, width, height, num_mines, cells, revealed=b"", flags=b""):
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        # Vues en lecture seule : l'observation ne peut pas être modifiée
+        self.cells = memoryview(cells).toreadonly()
+        self.revealed = memoryview(revealed).toreadonly().cast("B").cast("i")
+        self.flags = memoryview(flags).toreadonly().cast("B").cast("i")
+
+    def __reduce__(self):
+        return (Observation, (self.width, self.height, self.num_mines, self.cells.tobytes(),
+                              self.revealed.tobytes(), self.flags.tobytes()))
+
+    def __repr__(self):
+        return (f"Observation({self.width}x{self.height}, {self.num_mines} mines, "
+                f"{len(self.revealed)} révélées, {len(self.flags)} drapeaux)")
+
+    def get_value(self, x, y):
+        """Chiffre de la case (HIDDEN, FLAG ou MINE si elle n'en montre pas)"""
+        return self.cells[y * self.width + x]
+
+    def pack(self):
+        """Octets de l'observation (pour un buffer partagé, cf. unpack)"""
+        return b"".join((_HEADER.pack(self.width, self.height, self.num_mines, len(self.revealed), len(self.flags)),
+                         self.revealed.tobytes(), self.flags.tobytes(), self.cells.tobytes()))
+
+    @staticmethod
+    def unpack(buffer):
+        """Observation lue dans un buffer écrit par pack() (bytes, mmap,
+        multiprocessing.shared_memory...), sans copie : le buffer doit rester ouvert"""
+        view = memoryview(buffer).cast("B")
+        width, height, num_mines, n_revealed, n_flags = _HEADER.unpack_from(view)
+        start = _HEADER.size
+        revealed = view[start:start + 4 * n_revealed]
+        start += 4 * n_revealed
+        flags = view[start:start + 4 * n_flags]
+        start += 4 * n_flags
+        return Observation(width, height, num_mines, view[start:start + width * height], revealed, flags)
+
+
+class ObservationBuilder:
+    """Observation d'une partie en cours, complétée coup par coup.
+    snapshot() en fige une copie (trois copies d'octets, quel que soit le nombre de coups)"""
+    def __init__(self, width, height, num_mines):
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        self.cells = bytearray([HIDDEN]) * (width * height)
+        self.revealed = array("i")
+        self.flags = array("i")
+
+    def reveal(self, i, value):
+        """Case i révélée avec son chiffre (-1 pour une mine). False si elle l'était déjà"""
+        if self.cells[i] not in (HIDDEN, FLAG): return False
+        self.cells[i] = MINE if value < 0 else value
+        self.revealed.append(i)
+        return True
+
+    def reveal_many(self, cells):
+        """reveal() pour une suite de (i, chiffre), dans l'ordre"""
+        board = self.cells
+        append = self.revealed.append
+        for i, value in cells:
+            if board[i] == HIDDEN or board[i] == FLAG:
+                board[i] = MINE if value < 0 else value
+                append(i)
+
+    def flag(self, i):
+        """Drapeau sur la case i. False si elle n'est pas cachée"""
+        if self.cells[i] != HIDDEN: return False
+        self.cells[i] = FLAG
+        self.flags.append(i)
+        return True
+
+    def snapshot(self):
+        return Observation(self.width, self.height, self.num_mines, bytes(self.cells),
+                           self.revealed.tobytes(), self.flags.tobytes())
@@ -0,0 +1,111 @@
+import sys
+from collections import OrderedDict
+from probability import ComponentCounts
+
+# Les 8 symétries du carré (rotations et réflexions) : (x, y) -> (a*x + b*y, c*x + d*y)
+SYMMETRIES = (
+    (1, 0, 0, 1), (0, -1, 1, 0), (-1, 0, 0, -1), (0, 1, -1, 0),
+    (-1, 0, 0, 1), (1, 0, 0, -1), (0, 1, 1, 0), (0, -1, -1, 0),
+)
+
+
+def _sizeof(obj):
+    """Taille mémoire approximative d'une structure de tuples / listes / dicts d'entiers"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (tuple, list)):
+        size += sum(_sizeof(v) for v in obj)
+    return size
+
+
+class PatternCache:
+    """Cache LRU des composantes de frontière déjà énumérées.
+
+    La clé décrit la structure de la composante (positions relatives des
+    variables, contraintes sous forme (chiffre restant, variables)), normalisée
+    sur les 8 symétries du plateau : la même configuration tournée ou retournée
+    retombe sur la même entrée. La valeur est le résultat complet de
+    l'énumération (solutions par nombre de mines, dans l'ordre canonique).
+    """
+    def __init__(self, maxsize=20000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict() # clé -> (totals, var_counts, taille)
+        self.hits = 0
+        self.misses = 0
+        self.memory_bytes = 0
+
+    def canonical(self, variables, constraints, frontier):
+        """Retourne (clé, rang) où rang[i] est la position canonique de variables[i]"""
+        n = len(variables)
+        # 1. Positions relatives des variables sous chaque symétrie ; on garde la plus petite
+        candidates = []
+        for a, b, c, d in SYMMETRIES:
+            points = [(a * x + b * y, c * x + d * y) for (x, y) in variables]
+            min_x = min(p[0] for p in points)
+            min_y = min(p[1] for p in points)
+            points = [(px - min_x, py - min_y) for (px, py) in points]
+            order = sorted(range(n), key=points.__getitem__)
+            candidates.append((tuple(points[i] for i in order), order))
+        best_points = min(candidate[0] for candidate in candidates)
+
+        # 2. Contraintes renumérotées, seulement pour les symétries à égalité (motif symétrique)
+        index = {v: i for i, v in enumerate(variables)}
+        best = None
+        for points, order in candidates:
+            if points != best_points: continue
+            rank = [0] * n
+            for r, i in enumerate(order):
+                rank[i] = r
+            shape = tuple(sorted(
+                (frontier.remaining[k], tuple(sorted(rank[index[v]] for v in frontier.hidden[k])))
+                for k in constraints))
+            if best is None or shape < best[0][1]:
+                best = ((points, shape), rank)
+        return best
+
+    def get(self, key, rank, variables):
+        """ComponentCounts pour ces variables, ou None si la clé est absente"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        totals, var_counts, _ = entry
+        counts = ComponentCounts(variables)
+        counts.totals = dict(totals)
+        counts.var_counts = {m: [canon[r] for r in rank] for m, canon in var_counts.items()}
+        return counts
+
+    def put(self, key, rank, counts):
+        """Mémorise une énumération complète"""
+        if key in self._entries or not counts.complete: return
+        var_counts = {}
+        for m, values in counts.var_counts.items():
+            canon = [0] * len(values)
+            for i, r in enumerate(rank):
+                canon[r] = values[i]
+            var_counts[m] = canon
+        size = _sizeof(key) + _sizeof(counts.totals) + _sizeof(var_counts)
+        self._entries[key] = (dict(counts.totals), var_counts, size)
+        self.memory_bytes += size
+        while len(self._entries) > self.maxsize:
+            _, (_, _, old_size) = self._entries.popitem(last=False)
+            self.memory_bytes -= old_size
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def info(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hit_rate(), 'memory_bytes': self.memory_bytes}
+
+    def clear(self):
+        self._entries.clear()
+        self.memory_bytes = 0
+
+
+# Cache partagé par tous les solveurs du processus (donc entre les parties du benchmark)
+shared_cache = PatternCache()
@@ -0,0 +1,122 @@
+import math
+
+
+class ComponentCounts:
+    """Solutions d'une composante de la frontière, regroupées par nombre de mines.
+
+    totals[m] = nombre de solutions avec m mines
+    var_counts[m][i] = nombre de ces solutions où la variable i est une mine
+    """
+    def __init__(self, variables):
+        self.variables = variables
+        self.totals = {}
+        self.var_counts = {}
+        self.complete = True # False si l'énumération a été interrompue
+        self.aborted = False # True si elle l'a été faute de budget (cf. CSPSolver.time_budget)
+        # Comptes estimés par échantillonnage (cf. sampling.py) : nombre de tirages et taille effective
+        self.samples = None
+        self.ess = None
+
+    def add(self, values):
+        """Ajoute une solution (liste de 0/1 dans l'ordre de self.variables)"""
+        m = sum(values)
+        self.totals[m] = self.totals.get(m, 0) + 1
+        counts = self.var_counts.get(m)
+        if counts is None:
+            counts = self.var_counts[m] = [0] * len(self.variables)
+        for i, v in enumerate(values):
+            if v: counts[i] += 1
+
+    def total(self):
+        return sum(self.totals.values())
+
+    def certainties(self):
+        """Variables sûres / minées dans toutes les solutions : (sûres, mines)"""
+        total = self.total()
+        if not total: return [], []
+        safe = []
+        mines = []
+        for i, var in enumerate(self.variables):
+            n = sum(counts[i] for counts in self.var_counts.values())
+            if n == 0: safe.append(var)
+            elif n == total: mines.append(var)
+        return safe, mines
+
+    def distribution(self):
+        """Liste p[m] = proportion des solutions avec m mines"""
+        total = self.total()
+        dist = [0.0] * (len(self.variables) + 1)
+        for m, n in self.totals.items():
+            dist[m] = n / total
+        return dist
+
+
+def _convolve(a, b):
+    out = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if not x: continue
+        for j, y in enumerate(b):
+            out[i + j] += x * y
+    return out
+
+
+def _log_comb(n, k):
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def mine_probabilities(components, interior, mines_left):
+    """Probabilités exactes de mine pour chaque variable de la frontière et pour
+    une case "intérieure" (cachée, hors frontière).
+
+    Chaque combinaison de solutions des composantes qui place k mines sur la
+    frontière est pondérée par C(interior, mines_left - k) : le nombre de façons
+    de placer les mines restantes dans l'intérieur.
+    Retourne (prob_map, proba_intérieur), ou (None, None) si aucune
+    combinaison n'est compatible avec le nombre de mines restantes.
+    """
+    # Poids binomiaux (en log pour éviter les débordements sur les grandes grilles)
+    max_k = sum(len(c.variables) for c in components)
+    log_w = [None] * (max_k + 1)
+    for k in range(max_k + 1):
+        rest = mines_left - k
+        if 0 <= rest <= interior:
+            log_w[k] = _log_comb(interior, rest)
+    valid = [lw for lw in log_w if lw is not None]
+    if not valid: return None, None
+    ref = max(valid)
+    weights = [math.exp(lw - ref) if lw is not None else 0.0 for lw in log_w]
+
+    # Convolutions préfixe / suffixe : distribution des mines sur "toutes les autres" composantes
+    dists = [c.distribution() for c in components]
+    prefix = [[1.0]]
+    for d in dists:
+        prefix.append(_convolve(prefix[-1], d))
+    suffix = [[1.0]]
+    for d in reversed(dists):
+        suffix.append(_convolve(suffix[-1], d))
+    suffix.reverse()
+
+    full = prefix[-1]
+    z = sum(p * weights[k] for k, p in enumerate(full))
+    if z <= 0: return None, None
+
+    prob_map = {}
+    for i, comp in enumerate(components):
+        others = _convolve(prefix[i], suffix[i + 1])
+        total = comp.total()
+        probs = [0.0] * len(comp.variables)
+        for m, counts in comp.var_counts.items():
+            # Poids de "m mines dans cette composante" combiné avec toutes les autres
+            w_m = sum(p * weights[m + o] for o, p in enumerate(others) if p)
+            if not w_m: continue
+            for j, n in enumerate(counts):
+                if n: probs[j] += (n / total) * w_m
+        for var, p in zip(comp.variables, probs):
+            prob_map[var] = p / z
+
+    interior_prob = None
+    if interior > 0:
+        expected = sum(p * weights[k] * (mines_left - k) for k, p in enumerate(full))
+        interior_prob = expected / (z * interior)
+
+    return prob_map, interior_prob
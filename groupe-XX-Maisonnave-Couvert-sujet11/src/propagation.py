@@ -0,0 +1,81 @@
+def propagate(frontier, max_derived=5000):
+    """Réduction des contraintes par paires, en temps polynomial.
+
+    Pour deux contraintes A et B qui se chevauchent, le nombre de mines dans
+    A∩B est borné par les deux chiffres. Quand une des régions A∩B, A\\B ou B\\A
+    a alors un nombre de mines connu exactement, elle devient une nouvelle
+    contrainte (cas du sous-ensemble : si A ⊆ B, B\\A contient vB - vA mines).
+    Une région à 0 mine est sûre, une région pleine est minée ; les cases ainsi
+    fixées sont retirées des autres contraintes. On itère jusqu'au point fixe.
+    Retourne (sûres, mines).
+    """
+    count = {}    # région (frozenset de cases) -> nombre de mines
+    by_var = {}   # case -> régions qui la contiennent
+    known = {}    # case -> 0 (sûre) ou 1 (mine)
+    pending = []  # cases fixées à retirer des régions
+    queue = []
+    derived = -len(frontier.hidden) # Les contraintes d'origine ne comptent pas dans la limite
+
+    def add(cells, n):
+        nonlocal derived
+        if not cells or cells in count: return
+        if n < 0 or n > len(cells): return # Incohérent (ne devrait pas arriver)
+        if n == 0 or n == len(cells):
+            for v in cells:
+                if v not in known:
+                    known[v] = 1 if n else 0
+                    pending.append(v)
+            return
+        if derived >= max_derived: return
+        derived += 1
+        count[cells] = n
+        for v in cells:
+            by_var.setdefault(v, set()).add(cells)
+        queue.append(cells)
+
+    def remove(cells):
+        n = count.pop(cells)
+        for v in cells:
+            by_var[v].discard(cells)
+        return n
+
+    for c, hidden in frontier.hidden.items():
+        add(frozenset(hidden), frontier.remaining[c])
+
+    while pending or queue:
+        # 1. Retirer les cases fixées des régions qui les contiennent
+        while pending:
+            v = pending.pop()
+            for cells in list(by_var.get(v, ())):
+                n = remove(cells)
+                add(cells - {v}, n - known[v])
+        if not queue: break
+
+        # 2. Croiser une région avec toutes celles qui la chevauchent
+        a = queue.pop()
+        if a not in count: continue
+        overlapping = set()
+        for v in a:
+            overlapping.update(by_var[v])
+        overlapping.discard(a)
+
+        for b in overlapping:
+            if a not in count: break
+            if b not in count: continue
+            na = count[a]
+            nb = count[b]
+            inter = a & b
+            only_a = a - inter
+            only_b = b - inter
+            # Bornes sur le nombre de mines dans l'intersection. Si elles se rejoignent,
+            # les trois régions ont un nombre de mines exact (sinon aucune ne l'a)
+            lo = max(0, na - len(only_a), nb - len(only_b))
+            hi = min(len(inter), na, nb)
+            if lo == hi:
+                add(inter, lo)
+                add(only_a, na - lo)
+                add(only_b, nb - lo)
+
+    safe = [v for v, value in known.items() if value == 0]
+    mines = [v for v, value in known.items() if value == 1]
+    return safe, mines
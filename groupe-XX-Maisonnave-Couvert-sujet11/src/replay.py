@@ -0,0 +1,139 @@
+import argparse
+import base64
+import json
+import time
+from game_engine import Minesweeper
+
+# Format : JSON Lines. Ligne 1 = en-tête (dimensions, graine, mines en bitmap),
+# puis un coup par ligne : ["r", x, y, phase] (révélation) ou ["f", x, y, phase] (drapeau)
+FORMAT = "minesweeper-replay"
+VERSION = 1
+
+
+def mines_to_bitmap(cells, width, height):
+    """Mines -> bitmap (1 bit par case, indice y * width + x) encodé en base64"""
+    bits = bytearray((width * height + 7) // 8)
+    for (x, y) in cells:
+        i = y * width + x
+        bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def bitmap_to_mines(data, width, height):
+    bits = base64.b64decode(data)
+    return [(i % width, i // width) for i in range(width * height) if bits[i >> 3] >> (i & 7) & 1]
+
+
+class ReplayRecorder:
+    """Enregistre les coups d'une partie (et la phase du solveur qui les a produits).
+    `game` peut être fourni plus tard (avant save())"""
+    def __init__(self, game=None, seed=None):
+        self.game = game
+        self.seed = seed
+        self.moves = []
+
+    def reveal(self, x, y, phase=None):
+        self.moves.append(["r", x, y, phase])
+
+    def flag(self, x, y, phase=None):
+        self.moves.append(["f", x, y, phase])
+
+    def record(self, safe, delta, phase=None):
+        """Coups réellement joués par `delta = game.apply(safe, mines)` : drapeaux posés
+        (delta.flagged), puis chaque case de `safe` qui a été ouverte, jusqu'à la mine
+        touchée (delta.boom). Les cases ignorées par apply() (déjà révélées ou marquées)
+        ne sont pas écrites ; une case ouverte par l'effet de cascade d'une précédente
+        l'est aussi au rejeu, la révéler de nouveau ne fait rien"""
+        for (x, y) in delta.flagged:
+            self.flag(x, y, phase)
+        opened = set(delta.opened)
+        for cell in safe:
+            if cell in opened:
+                self.reveal(*cell, phase)
+            if cell == delta.boom:
+                break
+
+    def header(self):
+        game = self.game
+        return {'format': FORMAT, 'version': VERSION, 'width': game.width, 'height': game.height,
+                'mines': game.num_mines, 'seed': self.seed,
+                'mine_bitmap': mines_to_bitmap(game.grid, game.width, game.height)}
+
+    def save(self, path):
+        """Écrit le journal (les mines sont connues après le premier clic)"""
+        with open(path, "w") as f:
+            f.write(json.dumps(self.header()) + "\n")
+            for move in self.moves:
+                f.write(json.dumps(move, separators=(",", ":")) + "\n")
+
+
+def load(path):
+    """Retourne (en-tête, coups)"""
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get('format') != FORMAT:
+            raise ValueError(f"{path} : pas un journal de partie ({header.get('format')!r})")
+        moves = [json.loads(line) for line in f if line.strip()]
+    return header, moves
+
+
+def new_game(header, compact=False):
+    """Partie avec les mines du journal (le premier clic ne les déplace pas)"""
+    game = Minesweeper(header['width'], header['height'], header['mines'], compact=compact)
+    game.set_mines(bitmap_to_mines(header['mine_bitmap'], header['width'], header['height']))
+    return game
+
+
+def apply_move(game, move):
+    """Rejoue un coup. Retourne True si c'est une mine (Perdu)"""
+    kind, x, y = move[0], move[1], move[2]
+    if kind == "f":
+        # Comme game.apply() : pas de drapeau sur une case déjà révélée
+        if (x, y) not in game.revealed: game.flags.add((x, y))
+        return False
+    return game.reveal(x, y)
+
+
+def replay(header, moves, until=None, compact=False):
+    """Rejoue les coups (les `until` premiers si précisé) sans interface.
+    Retourne (partie, résultat) avec résultat = "VICTOIRE", "DÉFAITE" ou None (partie en cours)"""
+    game = new_game(header, compact)
+    for move in moves[:until]:
+        if apply_move(game, move):
+            return game, "DÉFAITE"
+    if game.won():
+        return game, "VICTOIRE"
+    return game, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejoue un journal de partie sans interface")
+    parser.add_argument("log", help="Journal (.jsonl) écrit par benchmark.py --record-losses ou main.py --record")
+    parser.add_argument("--until", type=int, default=None, help="Ne rejoue que les N premiers coups")
+    parser.add_argument("--solve", action="store_true",
+                        help="Puis demande un coup à l'IA sur la position atteinte (avec instrumentation)")
+    args = parser.parse_args(argv)
+
+    header, moves = load(args.log)
+    start = time.perf_counter()
+    game, result = replay(header, moves, args.until)
+    elapsed = time.perf_counter() - start
+    n = len(moves) if args.until is None else min(args.until, len(moves))
+    print(f"🎬 {header['width']}x{header['height']}, {header['mines']} mines (graine {header['seed']}) : "
+          f"{n} coups rejoués en {elapsed*1000:.1f} ms -> {result or 'en cours'}")
+    if result == "DÉFAITE":
+        phase = next((m[3] for m in moves if m[0] == "r" and (m[1], m[2]) == game.killer_move), None)
+        print(f"💀 Coup fatal : {game.killer_move} (phase {phase})")
+
+    if args.solve and result is None:
+        from csp_solver import CSPSolver
+        from instrumentation import Stats
+        stats = Stats()
+        solver = CSPSolver(game, stats=stats)
+        safe, mines = solver.solve()
+        print(f"🤖 Phase {solver.last_phase} : {len(safe)} sûres, {len(mines)} mines")
+        print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import numpy as np
+from constraint_model import ConstraintModel
+from probability import ComponentCounts
+
+
+def _bfs_order(model):
+    """Ordre des variables en largeur à travers les contraintes : chaque contrainte
+    est fermée tôt, les impasses apparaissent au plus près de leur cause"""
+    n = len(model.variables)
+    seen = [False] * n
+    order = []
+    for start in range(n):
+        if seen[start]: continue
+        seen[start] = True
+        queue = [start]
+        for i in queue:
+            order.append(i)
+            for c in model.var_constraints[i]:
+                for j in model.members[c]:
+                    if not seen[j]:
+                        seen[j] = True
+                        queue.append(j)
+    return order
+
+
+def sample_component(variables, constraints, frontier, n_samples=2000, seed=None):
+    """Estime les comptes d'une composante trop grosse pour être énumérée.
+
+    Échantillonnage séquentiel pondéré, vectorisé sur tous les tirages : les
+    variables sont posées une à une ; une valeur interdite par une contrainte
+    (trop de mines, ou plus assez de cases pour atteindre le chiffre) n'est
+    jamais tirée, sinon on tire "mine" avec la proportion de mines encore à
+    placer autour. Le poids d'un tirage est l'inverse de la probabilité de ses
+    choix : la somme des poids des tirages à m mines estime (à un facteur près)
+    le nombre de solutions à m mines. Les tirages bloqués ont un poids nul.
+    Retourne un ComponentCounts (comptes flottants, complete=False) avec
+    `samples` et `ess` (taille d'échantillon effective : l'écart type d'une
+    probabilité p vaut environ sqrt(p(1-p)/ess)), ou None si aucun tirage
+    n'aboutit.
+    """
+    model = ConstraintModel(variables, constraints, frontier)
+    if not model.feasible(): return None
+    rng = np.random.default_rng(seed)
+    n = len(variables)
+    targets = np.array(model.targets, dtype=np.int16)
+    unknown = np.array(model.unknown, dtype=np.int16) # Identique pour tous les tirages (même ordre)
+    mines = np.zeros((n_samples, len(targets)), dtype=np.int16)
+    values = np.zeros((n_samples, n), dtype=np.uint8)
+    log_w = np.zeros(n_samples)
+    alive = np.ones(n_samples, dtype=bool)
+
+    for i in _bfs_order(model):
+        cs = np.array(model.var_constraints[i])
+        need = targets[cs] - mines[:, cs]        # Mines encore à placer dans chaque contrainte
+        left = unknown[cs]                       # Cases libres, celle-ci comprise
+        can_mine = (need >= 1).all(axis=1)
+        can_free = (need <= left - 1).all(axis=1)
+        both = can_mine & can_free
+        q = (need / left).mean(axis=1)
+        draw = rng.random(n_samples) < q
+        value = np.where(both, draw, can_mine)
+        log_w -= np.log(np.where(both, np.where(value, q, 1 - q), 1.0))
+        alive &= can_mine | can_free
+        values[:, i] = value
+        mines[:, cs] += value[:, None].astype(np.int16)
+        unknown[cs] -= 1
+
+    if not alive.any(): return None
+    log_w = log_w[alive]
+    values = values[alive]
+    w = np.exp(log_w - log_w.max())
+
+    counts = ComponentCounts(variables)
+    counts.complete = False
+    totals_m = values.sum(axis=1)
+    for m in np.unique(totals_m):
+        sel = totals_m == m
+        counts.totals[int(m)] = float(w[sel].sum())
+        counts.var_counts[int(m)] = (w[sel] @ values[sel]).tolist()
+    counts.samples = n_samples
+    counts.ess = float(w.sum() ** 2 / (w * w).sum())
+    return counts
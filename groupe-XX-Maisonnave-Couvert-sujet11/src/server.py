@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import random
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from csp_solver import CSPSolver
+from game_engine import neighbor_table
+from observation import ObservationBuilder, HIDDEN, FLAG
+from pattern_cache import PatternCache
+
+# Protocole : une requête JSON par ligne, une réponse JSON par ligne (même "id").
+# Une ligne contenant une liste de requêtes est un lot : réponse = liste dans le même ordre.
+#
+#   {"id": 1, "session": "a", "op": "solve", "mines": 10,
+#    "rows": ["??1 ", "?F2 ", ...], "probabilities": true}
+#
+# rows : une chaîne par ligne de la grille, "?" caché, "F" drapeau, "0"-"8" chiffre
+# révélé (" " vaut "0"). Opérations : solve, reset (oublie la session), info, ping.
+HIDDEN_CHAR = "?"
+FLAG_CHAR = "F"
+
+
+def observe(builder, rows):
+    """Intègre une observation textuelle dans `builder` (observation.ObservationBuilder) :
+    seules les cases nouvellement révélées ou marquées sont ajoutées, la frontière du
+    solveur reste incrémentale d'une requête à l'autre. Retourne False si elle contredit
+    la précédente (case re-cachée, chiffre ou drapeau modifié) : la session doit repartir de zéro.
+    ValueError si elle est impossible en elle-même (chiffre supérieur à ses voisins cachés ou
+    marqués, ou inférieur à ses drapeaux) ; le plateau n'est alors pas modifié"""
+    width, height = builder.width, builder.height
+    if len(rows) != height or any(len(row) != width for row in rows):
+        raise ValueError(f"rows : {height} lignes de {width} caractères attendues")
+    board = "".join(rows)
+    table = neighbor_table(width, height)
+    cells = builder.cells
+    opened = []
+    flagged = []
+    for y, row in enumerate(rows):
+        for x, char in enumerate(row):
+            i = y * width + x
+            state = cells[i]
+            if char == HIDDEN_CHAR:
+                if state != HIDDEN: return False
+            elif char == FLAG_CHAR:
+                if state == HIDDEN: flagged.append(i)
+                elif state != FLAG: return False
+            else:
+                value = 0 if char == " " else int(char)
+                if not 0 <= value <= 8:
+                    raise ValueError(f"chiffre invalide en ({x}, {y}) : {char!r}")
+                around = [board[j] for j in table.neighbors(i)]
+                n_flags = around.count(FLAG_CHAR)
+                if value > n_flags + around.count(HIDDEN_CHAR) or value < n_flags:
+                    raise ValueError(f"chiffre {value} en ({x}, {y}) incompatible avec ses voisins")
+                if state == HIDDEN: opened.append((i, value))
+                elif state != value: return False
+    for i in flagged:
+        builder.flag(i)
+    for i, value in opened:
+        builder.reveal(i, value)
+    return True
+
+
+class Session:
+    """Plateau observé + solveur (frontière et cache de motifs propres à la session)"""
+    def __init__(self, width, height, num_mines, seed=None, solver_options=None):
+        self.board = ObservationBuilder(width, height, num_mines)
+        # Pas de partie derrière : le solveur ne reçoit que des observations
+        self.solver = CSPSolver(None, verbose=False, rng=random.Random(seed),
+                                pattern_cache=PatternCache(), **(solver_options or {}))
+        self.lock = threading.Lock() # Les requêtes d'une même session passent l'une après l'autre
+        self.requests = 0
+
+
+class SolverServer:
+    """Répond aux requêtes ; les sessions sont partagées entre connexions"""
+    def __init__(self, workers=None, solver_options=None):
+        self.solver_options = solver_options or {}
+        self.sessions = {}
+        self._sessions_lock = threading.Lock()
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        # Requêtes d'un lot : pool séparé. Une ligne de lot occupe déjà un thread de
+        # self.pool ; y soumettre ses requêtes et les attendre pourrait tout bloquer
+        self.batch_pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def handle_line(self, line):
+        """Réponse (chaîne JSON) à une ligne de requête"""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps({'ok': False, 'error': f"JSON invalide : {e}"})
+        if isinstance(request, list):
+            # Lot : requêtes traitées en parallèle, réponses dans l'ordre
+            futures = [self.batch_pool.submit(self.handle, r) for r in request]
+            return json.dumps([f.result() for f in futures])
+        return json.dumps(self.handle(request))
+
+    def handle(self, request):
+        """Traite une requête (dict) et retourne la réponse (dict)"""
+        if not isinstance(request, dict):
+            return {'id': None, 'ok': False, 'error': f"requête : objet JSON attendu, pas {type(request).__name__}"}
+        response = {'id': request.get('id')}
+        try:
+            response.update(self._dispatch(request))
+            response['ok'] = True
+        except (KeyError, TypeError, ValueError) as e:
+            response['ok'] = False
+            response['error'] = f"{type(e).__name__} : {e}"
+        return response
+
+    def _dispatch(self, request):
+        op = request.get('op', 'solve')
+        name = str(request.get('session', 'default'))
+        if op == 'ping':
+            return {'pong': True}
+        if op == 'reset':
+            with self._sessions_lock:
+                return {'reset': self.sessions.pop(name, None) is not None}
+        if op == 'info':
+            with self._sessions_lock:
+                session = self.sessions.get(name)
+            if session is None: return {'session': None}
+            return {'session': {'requests': session.requests, 'revealed': len(session.board.revealed),
+                                'pattern_cache': session.solver.pattern_cache.info()}}
+        if op != 'solve':
+            raise ValueError(f"opération inconnue : {op!r}")
+        return self._solve(name, request)
+
+    def _session(self, name, request, width, height):
+        with self._sessions_lock:
+            session = self.sessions.get(name)
+            board = session.board if session is not None else None
+            if board is None or (board.width, board.height, board.num_mines) != (width, height, request['mines']):
+                session = Session(width, height, request['mines'], request.get('seed'), self.solver_options)
+                self.sessions[name] = session
+            return session
+
+    def _solve(self, name, request):
+        rows = request['rows']
+        height = len(rows)
+        width = len(rows[0]) if rows else 0
+        mines = request['mines']
+        if not isinstance(mines, int) or not 0 <= mines <= width * height:
+            raise ValueError(f"mines : entier entre 0 et {width * height} attendu, pas {mines!r}")
+        session = self._session(name, request, width, height)
+        with session.lock:
+            if not observe(session.board, rows):
+                # Observation incompatible (nouvelle partie ?) : session neuve, même nom
+                with self._sessions_lock:
+                    session = Session(width, height, request['mines'], request.get('seed'), self.solver_options)
+                    self.sessions[name] = session
+                observe(session.board, rows)
+            session.requests += 1
+            start = time.perf_counter()
+            session.solver.prob_map = None
+            session.solver.interior_prob = None
+            safe, mines = session.solver.solve(session.board.snapshot())
+            result = {'safe': [list(c) for c in safe], 'mines': [list(c) for c in mines],
+                      'phase': session.solver.last_phase,
+                      'ms': round((time.perf_counter() - start) * 1000, 3)}
+            if request.get('probabilities'):
+                # Probabilités calculées seulement quand il faut parier (phase "guess")
+                prob_map = session.solver.prob_map
+                result['probabilities'] = None if prob_map is None else \
+                    [[x, y, round(p, 6)] for (x, y), p in sorted(prob_map.items())]
+                result['interior'] = session.solver.interior_prob
+            return result
+
+    def serve_stdio(self, stdin=sys.stdin, stdout=sys.stdout):
+        """Requêtes sur stdin, réponses sur stdout, au fil de l'eau (pas forcément dans l'ordre).
+        Au plus 2 requêtes par thread en attente : la lecture de stdin attend qu'une se termine,
+        et rien n'est gardé d'une requête traitée (service de longue durée)"""
+        write_lock = threading.Lock()
+        limit = 2 * self.workers
+        slots = threading.BoundedSemaphore(limit)
+        errors = []
+
+        def answer(line):
+            response = self.handle_line(line)
+            with write_lock:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+        def done(future):
+            if future.exception() is not None: errors.append(future.exception())
+            slots.release()
+
+        for line in stdin:
+            if not line.strip(): continue
+            slots.acquire()
+            self.pool.submit(answer, line).add_done_callback(done)
+        # Fin de stdin : attend les dernières réponses
+        for _ in range(limit):
+            slots.acquire()
+        for _ in range(limit):
+            slots.release()
+        if errors: raise errors[0]
+
+    def serve_socket(self, address):
+        """Socket local : chemin (Unix) ou port (TCP sur 127.0.0.1). Une connexion = un flux de lignes"""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip(): continue
+                    self.wfile.write((server.handle_line(line.decode("utf-8")) + "\n").encode("utf-8"))
+
+        if isinstance(address, int):
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            listener = socketserver.ThreadingTCPServer(("127.0.0.1", address), Handler)
+        else:
+            if os.path.exists(address): os.unlink(address)
+            listener = socketserver.ThreadingUnixStreamServer(address, Handler)
+        listener.daemon_threads = True
+        with listener:
+            listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solveur du Démineur en service (requêtes JSON, une par ligne)")
+    parser.add_argument("--socket", help="Écoute sur un socket Unix (chemin) au lieu de stdin/stdout")
+    parser.add_argument("--port", type=int, help="Écoute sur 127.0.0.1:PORT au lieu de stdin/stdout")
+    parser.add_argument("--workers", type=int, default=None, help="Requêtes traitées en parallèle (défaut : nombre de cœurs)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Budget de temps du solveur par requête (ms)")
+    args = parser.parse_args(argv)
+
+    solver_options = {}
+    if args.budget_ms is not None: solver_options['time_budget'] = args.budget_ms / 1000
+    server = SolverServer(args.workers, solver_options)
+    if args.socket:
+        server.serve_socket(args.socket)
+    elif args.port:
+        server.serve_socket(args.port)
+    else:
+        server.serve_stdio()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import queue
+import threading
+from csp_solver import CSPSolver
+
+
+class SolverWorker:
+    """Fait tourner CSPSolver dans un thread, hors de la boucle d'événements.
+
+    submit() envoie au thread une observation figée du plateau (game.observe(),
+    construite à partir des seuls coups joués depuis la précédente) : le solveur
+    ne lit jamais le plateau de l'interface. Le thread renvoie ses coups dans
+    une file que poll() vide sans bloquer.
+    cancel() (touche R, clic manuel) change de génération : le calcul en cours
+    est interrompu et tous les résultats plus anciens sont ignorés. Le test de
+    génération et la remise à zéro de l'annulation du solveur se font sous le même
+    verrou que cancel() : une annulation n'est jamais perdue.
+    """
+    def __init__(self, game, **solver_options):
+        self.game = game
+        self.solver = CSPSolver(game, **solver_options)
+        self._generation = 0
+        self._lock = threading.Lock() # Génération et annulation du solveur changent ensemble
+        self._pending = False # Une demande de la génération courante est en cours
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="solver", daemon=True)
+        self._thread.start()
+
+    def busy(self):
+        return self._pending
+
+    def submit(self):
+        """Demande un coup pour l'état actuel du plateau"""
+        self._pending = True
+        self._requests.put((self._generation, self.game.observe()))
+
+    def cancel(self):
+        """Abandonne le calcul en cours : son résultat ne sera jamais rendu"""
+        with self._lock:
+            self._generation += 1
+            self._pending = False
+            self.solver.cancel()
+
+    def poll(self):
+        """Résultats arrivés depuis le dernier appel (génération courante seulement) :
+        liste de (sûres, mines, phase, prob_map) ; prob_map vaut None sauf pour un pari"""
+        results = []
+        while True:
+            try:
+                generation, result = self._results.get_nowait()
+            except queue.Empty:
+                return results
+            if generation == self._generation:
+                self._pending = False
+                results.append(result)
+
+    def stop(self):
+        self.cancel()
+        self._requests.put(None)
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is None: return
+            # Une demande périmée est sautée : la suivante contient aussi ses coups
+            generation, view = request
+            with self._lock:
+                if generation != self._generation: continue
+                # Demande acceptée : un cancel() arrivé après ce point interrompt bien ce solve()
+                self.solver.resume()
+
+            safe, mines = self.solver.solve(view)
+            phase = self.solver.last_phase
+            # Nouvelle carte de probabilités seulement si le coup est un pari
+            prob_map = self.solver.prob_map if phase == "guess" else None
+            self._results.put((generation, (safe, mines, phase, prob_map)))
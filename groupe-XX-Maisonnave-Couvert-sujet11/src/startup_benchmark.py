@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Points d'entrée : script et s'il doit rester sans interface (jamais de pygame)
+ENTRY_POINTS = {
+    'launcher':  ("launcher", False),
+    'main':      ("src/main.py", False),
+    'benchmark': ("src/benchmark.py", True),
+    'replay':    ("src/replay.py", True),
+    'server':    ("src/server.py", True),
+}
+# Modules lourds dont on surveille le chargement
+HEAVY = ("pygame", "numpy", "pandas", "matplotlib")
+
+# Exécuté dans un interpréteur neuf : charge le script comme `python script --help`
+# (imports + arguments, sans ouvrir de fenêtre ni lancer de calcul) puis liste les modules lourds
+_PROBE = """
+import os, runpy, sys
+path = sys.argv[1]
+sys.argv = [path, "--help"]
+sys.path.insert(0, os.path.dirname(path))
+sys.stdout = open(os.devnull, "w")
+try:
+    runpy.run_path(path, run_name="__main__")
+except SystemExit:
+    pass
+sys.stdout = sys.__stdout__
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def cold_start(script, runs=5):
+    """Temps (s) d'un démarrage à froid de `script`, un nouvel interpréteur par mesure.
+    Retourne (temps, modules lourds chargés)"""
+    probe = _PROBE.format(heavy=HEAVY)
+    times = []
+    loaded = []
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    for _ in range(runs):
+        start = time.perf_counter()
+        # Délai maximal : un script qui ignore --help (boucle d'événements...) ne bloque pas la mesure
+        out = subprocess.run([sys.executable, "-c", probe, script], capture_output=True, text=True,
+                             env=env, check=True, timeout=60).stdout
+        times.append(time.perf_counter() - start)
+        loaded = [m for m in out.strip().split(",") if m]
+    return times, loaded
+
+
+def interpreter_start(runs=5):
+    """Temps de démarrage de Python seul (référence à retrancher)"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def slowest_imports(script, top=5):
+    """Les `top` imports les plus coûteux (cumulés, en ms) d'après python -X importtime"""
+    probe = _PROBE.format(heavy=HEAVY)
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", probe, script],
+                         capture_output=True, text=True, check=True, timeout=60).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Modules de premier niveau seulement (les sous-imports sont indentés)
+        if name.startswith("  "): continue
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def run(names=None, runs=5, imports=False):
+    """Mesure chaque point d'entrée ; retourne un dict sérialisable en JSON"""
+    base = interpreter_start(runs)
+    results = {'python_ms': statistics.median(base) * 1000, 'runs': runs, 'entry_points': {}}
+    print(f"🐍 Python seul : {results['python_ms']:.1f} ms (médiane sur {runs})")
+    failed = []
+    for name in names or ENTRY_POINTS:
+        script, headless = ENTRY_POINTS[name]
+        times, loaded = cold_start(os.path.join(BASE_DIR, script), runs)
+        entry = {'median_ms': statistics.median(times) * 1000, 'min_ms': min(times) * 1000,
+                 'heavy_modules': loaded, 'headless': headless}
+        results['entry_points'][name] = entry
+        ok = not (headless and "pygame" in loaded)
+        if not ok: failed.append(name)
+        print(f"{'✅' if ok else '❌'} {name:<10} médiane {entry['median_ms']:7.1f} ms  min {entry['min_ms']:7.1f} ms  "
+              f"modules lourds : {', '.join(loaded) or 'aucun'}")
+        if imports:
+            for ms, module in slowest_imports(os.path.join(BASE_DIR, script)):
+                print(f"      {ms:7.1f} ms  {module}")
+    if failed:
+        print(f"⚠️ pygame importé par un point d'entrée sans interface : {', '.join(failed)}")
+    results['failed'] = failed
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps de démarrage à froid de chaque point d'entrée")
+    parser.add_argument("names", nargs="*", metavar="POINT",
+                        help=f"Points d'entrée à mesurer (tous par défaut) : {', '.join(ENTRY_POINTS)}")
+    parser.add_argument("--runs", type=int, default=5, help="Démarrages par point d'entrée (médiane)")
+    parser.add_argument("--imports", action="store_true", help="Détaille les imports les plus lents (python -X importtime)")
+    parser.add_argument("--output", help="Écrit les mesures en JSON (pour suivre leur évolution)")
+    args = parser.parse_args(argv)
+    unknown = [n for n in args.names if n not in ENTRY_POINTS]
+    if unknown: parser.error(f"point d'entrée inconnu : {', '.join(unknown)}")
+
+    results = run(args.names, args.runs, args.imports)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Résultats écrits dans {args.output}")
+    if results['failed']: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
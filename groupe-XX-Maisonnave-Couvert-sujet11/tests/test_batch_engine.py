@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from batch_engine import BatchMinesweeper, LOST
+
+
+def test_apply_d_une_vue_passe_par_le_lot():
+    batch = BatchMinesweeper(2, 9, 9, 10, seeds=[1, 2])
+    batch.start()
+    view = batch.view(1)
+    hidden = [(x, y) for y in range(9) for x in range(9) if not batch.revealed[1, y, x]]
+    mine = next(c for c in hidden if batch.mines[1, c[1], c[0]])
+    safe = next(c for c in hidden if not batch.mines[1, c[1], c[0]])
+
+    delta = view.apply([], [mine])
+    assert delta.flagged == [mine] and batch.flags[1, mine[1], mine[0]]
+    # Le drapeau est vu par la logique vectorisée : aucune mine à (re)proposer sur cette case
+    assert not batch.simple_logic([1])[1][0, mine[1], mine[0]]
+
+    delta = view.apply([safe], [])
+    assert safe in delta.opened and delta.boom is None
+    assert view.safe_left == 81 - 10 - int(batch.revealed[1].sum())
+
+    other = next(c for c in hidden if batch.mines[1, c[1], c[0]] and c != mine)
+    delta = view.apply([other], [])
+    assert delta.boom == other and view.lost() and batch.status[1] == LOST
+    assert not batch.revealed[0].all() # L'autre partie n'est pas touchée
@@ -0,0 +1,12 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from benchmark import _play_chunk
+
+
+def test_lots_independants_du_decoupage():
+    config = {'seed': 3, 'width': 9, 'height': 9, 'mines': 10, 'compact': False, 'batch': True}
+    whole = _play_chunk((0, 24, config))
+    parts = [_play_chunk((i, i + 5 if i + 5 < 24 else 24, config)) for i in range(0, 24, 5)]
+    assert whole == tuple(sum(p[k] for p in parts) for k in range(3))
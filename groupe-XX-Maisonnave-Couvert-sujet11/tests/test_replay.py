@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from benchmark import play_game
+from replay import ReplayRecorder, mines_to_bitmap, new_game, replay
+
+
+def test_rejeu_identique_a_la_partie():
+    # Le journal rejoué redonne exactement le plateau de la partie (drapeaux compris)
+    for seed in range(10):
+        recorder = ReplayRecorder(seed=seed)
+        won, _ = play_game(seed, 16, 16, 40, recorder=recorder)
+        game = recorder.game
+        replayed, result = replay(recorder.header(), recorder.moves)
+        assert result == ("VICTOIRE" if won else "DÉFAITE")
+        assert replayed.revealed == game.revealed
+        assert replayed.flags == game.flags
+        assert replayed.killer_move == game.killer_move
+
+
+def test_coups_ignores_par_apply_non_rejoues():
+    # Drapeau demandé sur une case déjà révélée, révélation d'une case marquée :
+    # apply() les ignore, le journal ne doit pas les contenir
+    header = {'width': 4, 'height': 1, 'mines': 1, 'seed': None}
+    game = new_game(dict(header, mine_bitmap=mines_to_bitmap([(3, 0)], 4, 1)))
+    recorder = ReplayRecorder(game)
+    delta = game.apply([(0, 0)], [])
+    recorder.record([(0, 0)], delta)
+    delta = game.apply([(3, 0)], [(0, 0), (3, 0)])
+    recorder.record([(3, 0)], delta)
+    replayed, result = replay(recorder.header(), recorder.moves)
+    assert result == "VICTOIRE"
+    assert replayed.flags == game.flags == {(3, 0)}
@@ -0,0 +1,72 @@
+import io
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from server import SolverServer
+
+
+def test_requete_pas_un_objet():
+    server = SolverServer(workers=1)
+    for line in ('5', '"x"', 'null', '[1, "x"]'):
+        response = json.loads(server.handle_line(line))
+        for r in (response if isinstance(response, list) else [response]):
+            assert r['ok'] is False and "objet JSON attendu" in r['error']
+    # Le service répond toujours après une requête invalide
+    assert json.loads(server.handle_line('{"op": "ping", "id": 1}')) == {'id': 1, 'pong': True, 'ok': True}
+
+
+def test_lot_avec_un_seul_thread():
+    # Une ligne de lot ne doit pas attendre un thread qu'elle occupe elle-même
+    server = SolverServer(workers=1)
+    stdin = io.StringIO('[{"op": "ping", "id": 1}, {"op": "ping", "id": 2}]\n5\n[{"op": "ping", "id": 3}]\n')
+    stdout = io.StringIO()
+    thread = threading.Thread(target=server.serve_stdio, args=(stdin, stdout), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert len(lines) == 3
+    assert [r['id'] for r in lines[0]] == [1, 2]
+
+
+def test_solve_observation_partielle():
+    server = SolverServer(workers=1)
+    request = {'id': 7, 'session': 's', 'mines': 1, 'rows': ['1?', '??'], 'probabilities': True}
+    response = json.loads(server.handle_line(json.dumps(request)))
+    assert response['ok'] and response['phase'] == 'guess'
+    assert len(response['probabilities']) == 3
+
+
+def test_zero_revele_observation_partielle():
+    # Les voisins cachés d'un 0 sont sûrs (le client n'a pas forcément ouvert la zone)
+    server = SolverServer(workers=1)
+    request = {'id': 1, 'mines': 3, 'rows': ['0????'] + ['?????'] * 4}
+    response = json.loads(server.handle_line(json.dumps(request)))
+    assert response['ok'] and response['phase'] != 'guess'
+    assert sorted(map(tuple, response['safe'])) == [(0, 1), (1, 0), (1, 1)]
+
+
+def test_observation_impossible():
+    server = SolverServer(workers=1)
+    for request in ({'mines': 1, 'rows': ['2?'], 'probabilities': True},
+                    {'mines': 1, 'rows': ['1F', 'FF']},
+                    {'mines': 5, 'rows': ['1?', '??']},
+                    {'mines': -1, 'rows': ['1?', '??']}):
+        response = json.loads(server.handle_line(json.dumps(request)))
+        assert response['ok'] is False, request
+    # Le service répond toujours après une requête invalide
+    response = json.loads(server.handle_line(json.dumps({'mines': 1, 'rows': ['1?', '??']})))
+    assert response['ok']
+
+
+def test_stdio_nombreuses_requetes():
+    # Plus de lignes que de requêtes en attente autorisées : toutes reçoivent leur réponse
+    server = SolverServer(workers=2)
+    stdin = io.StringIO("".join(f'{{"op": "ping", "id": {i}}}\n' for i in range(200)))
+    stdout = io.StringIO()
+    server.serve_stdio(stdin, stdout)
+    ids = sorted(json.loads(line)['id'] for line in stdout.getvalue().splitlines())
+    assert ids == list(range(200))